@@ -1,29 +1,66 @@
 import streamlit as st
-import numpy as np
+import hashlib
+import time
 import random
 import io
 from PIL import Image, ImageDraw
+from embeddings import embed_batch, embed_text_sbert, load_model, model_name
+from embedding_cache import EmbeddingCache
+from answer_cache import AnswerCache, doc_set_key
+from pdf_ingest import IngestJob
+from rag_store import RagStore
+from context_packer import CONTEXT_TOKENS, pack_context
+
+TOP_K = 20   # chunks retrieved before packing into the token budget
 
 def run():
-    # --- Dummy placeholders for embedding & AI ---
-    def embed_text_sbert(text, model):
-        return np.random.rand(384)  # random vector
+    # --- Embedding model (cached across reruns) ---
+    @st.cache_resource
+    def get_embedder():
+        return load_model()
+
+    @st.cache_resource
+    def get_embedding_cache():
+        return EmbeddingCache()
+
+    @st.cache_resource
+    def get_answer_cache():
+        return AnswerCache()
+
+    embedder = get_embedder()
+    emb_cache = get_embedding_cache()
+    answer_cache = get_answer_cache()
 
-    def chunk_text(text, chunk_size=500):
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+    def embed_chunks(texts):
+        return emb_cache.get_or_compute(texts, model_name(embedder), lambda batch: embed_batch(batch, embedder))
 
+    # --- Dummy placeholders for AI ---
     def get_ai_client():
         return None
 
     def answer_with_ai(question, context):
         return f"[Simulated AI Answer] Based on context, answer for: '{question}'"
 
+    def stream_answer_with_ai(question, context):
+        # Yields the answer piece by piece, the way a streaming model client does
+        for word in answer_with_ai(question, context).split(" "):
+            yield word + " "
+
+    def render_stream(pieces, started):
+        """Write streamed pieces into one placeholder; returns (text, time to first token)."""
+        box = st.empty()
+        text, ttft = "", None
+        for piece in pieces:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            text += piece
+            box.markdown(text + "▌")
+        box.markdown(text)
+        return text, ttft
+
     # --- Search helper ---
-    def search(index, chunks, page_map, qvec, k):
-        results = []
-        for i in range(min(k, len(chunks))):
-            results.append((chunks[i], page_map[i]))
-        return results
+    def search(store, query, qvec, k):
+        return store.search_hybrid(query, qvec if store.dense else None, k)
 
     # --- STREAMLIT PAGE ---
     st.title("📚 Smart RAG Doubt Solver")
@@ -31,21 +68,65 @@ def run():
     st.markdown("---")
 
     uploaded = st.file_uploader("Upload PDFs", type=["pdf"], accept_multiple_files=True)
+    mode = st.radio(
+        "Retrieval mode",
+        ["Hybrid (keywords + meaning)", "Keywords only (fastest indexing)"],
+        horizontal=True,
+    )
+    dense = mode.startswith("Hybrid")
+    if dense:
+        if embedder is None:
+            st.caption("⚠️ Meaning search is using a word-hashing fallback (sentence-transformers is not "
+                       "installed), so it mostly repeats keyword matching.")
+        else:
+            st.caption(f"Meaning search: {model_name(embedder)}")
 
     if 'docs' not in st.session_state:
-        st.session_state.docs = []
-
-    if uploaded and len(uploaded) != len(st.session_state.docs):
-        st.session_state.docs = []
-        for file in uploaded:
-            st.session_state.docs.append({
-                "name": file.name,
-                "chunks": [f"Chunk {i} from {file.name}" for i in range(5)],
-                "pmap": list(range(5))
-            })
-        st.success(f"Loaded {len(st.session_state.docs)} PDF(s) successfully.")
+        st.session_state.docs = {}
+
+    # --- Diff uploads against indexed documents by content hash ---
+    uploads = {hashlib.sha256(f.getvalue()).hexdigest(): f for f in uploaded or []}
+    store = st.session_state.get("rag_store")
+    if store is None or store.dense != dense:
+        for doc in st.session_state.docs.values():
+            doc["job"].cancel()
+        st.session_state.docs = {}
+        store = st.session_state.rag_store = RagStore(embed_chunks if dense else None)
+
+    docs = st.session_state.docs
+    removed = [key for key in docs if key not in uploads]
+    for key in removed:
+        docs.pop(key)["job"].cancel()
+        store.remove_doc(key)
+
+    added = [key for key in uploads if key not in docs]
+    for key in added:
+        file = uploads[key]
+        store.add_doc(key, file.name)
+        docs[key] = {
+            "name": file.name,
+            "job": IngestJob(key, file.name, file.getvalue(), store).start()
+        }
+    if added or removed:
+        st.success(f"Added {len(added)} and removed {len(removed)} PDF(s); {len(docs)} loaded.")
+
+    # --- Ingestion progress ---
+    pending = [doc for doc in docs.values() if not doc["job"].finished]
+    for doc in docs.values():
+        job = doc["job"]
+        if job.error:
+            st.error(f"{doc['name']}: could not be read ({job.error})")
+        elif not job.started:
+            st.progress(0.0, text=f"Indexing {doc['name']}: waiting for a free worker")
+        elif not job.finished:
+            st.progress(job.progress, text=f"Indexing {doc['name']}: page {job.done_pages}/{job.total_pages or '?'}")
+    if pending:
+        st.caption("You can ask questions now — answers use the pages indexed so far.")
+        if st.button("🔄 Refresh progress"):
+            st.rerun()
 
     query = st.text_input("Ask your question ❓")
+    budget = st.slider("Context budget (tokens)", 300, 6000, CONTEXT_TOKENS, step=100)
 
     if st.button("Get Answer (RAG)"):
         if not st.session_state.docs:
@@ -55,7 +136,34 @@ def run():
             st.error("Enter a question!")
             st.stop()
 
-        all_context = "\n".join([c for doc in st.session_state.docs for c in doc["chunks"]])
-        answer = answer_with_ai(query, all_context)
+        started = time.perf_counter()
+        qvec = embed_text_sbert(query, embedder)
+        doc_set = doc_set_key(docs, model_name(embedder), "hybrid" if dense else "keywords", budget)
+        cached = answer_cache.get(doc_set, qvec)
+
         st.markdown("### ✅ Answer")
-        st.write(answer)
+        if cached:
+            answer, sources = cached["answer"], cached["sources"]
+            st.write(answer)
+            ttft = time.perf_counter() - started
+            st.caption("⚡ Answered from cache (a very similar question was asked before).")
+        else:
+            hits = search(store, query, qvec, TOP_K)
+            if not hits:
+                st.warning("No text indexed yet — wait a moment and try again.")
+                st.stop()
+            context, packed = pack_context(hits, budget)
+            answer, ttft = render_stream(stream_answer_with_ai(query, context), started)
+            sources = [[name, page, c[:300]] for c, page, name, _ in packed]
+            if not pending:
+                answer_cache.put(doc_set, query, qvec, {"answer": answer, "sources": sources})
+
+        total = time.perf_counter() - started
+        st.session_state.setdefault("rag_timings", []).append(
+            {"ttft": ttft, "total": total, "cached": bool(cached)}
+        )
+        st.caption(f"First token after {ttft * 1000:.0f} ms · full answer after {total * 1000:.0f} ms")
+
+        with st.expander("📄 Sources"):
+            for name, page, snippet in sources:
+                st.markdown(f"**{name} — page {page}**: {snippet}")
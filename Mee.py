@@ -1,7 +1,93 @@
 import streamlit as st
-import tensorflow as tf
 import numpy as np
+import csv
+import io
 from PIL import Image
+from image_features import (cached_features, count_images, extract_features, get_extractor, image_key,
+                            iter_feature_chunks, iter_images)
+from feature_classifier import KNN_K, DenseHead, PrototypeClassifier
+from model_store import export_tflite, has_tflite, list_models, load_extractor, load_meta, load_model, save_model
+from job_queue import ACTIVE, get_queue
+from job_status import render_job
+
+# ---------------- Helpers ----------------
+def train_job(ctx, samples, num_classes, feature_extractor):
+    """Background job: extract features for (class_id, image bytes) samples and fit the head."""
+    import tensorflow as tf
+
+    def on_batch(done, total):
+        ctx.check()
+        ctx.progress(0.9 * done / total, f"Extracted features for {done}/{total} new images")
+
+    X = cached_features(feature_extractor, [raw for _, raw in samples], on_batch=on_batch)
+    Y = tf.keras.utils.to_categorical([class_id for class_id, _ in samples], num_classes)
+
+    ctx.progress(0.9, "Training... Please wait.")
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(1280,)),
+        tf.keras.layers.Dense(128, activation="relu"),
+        tf.keras.layers.Dense(num_classes, activation="softmax")
+    ])
+
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(1e-4),
+        loss="categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+
+    model.fit(X, Y, epochs=10, batch_size=8, verbose=0)
+    # Predict with the weights in NumPy: no model.predict overhead per image
+    return DenseHead.from_keras(model)
+
+def export_job(ctx, name, extractor, images):
+    """Background job: int8 TFLite export of the feature extractor for a saved model."""
+    def on_step(done, total):
+        ctx.progress(0.8 * done / total, f"Calibrating on {done}/{total} images")
+    return export_tflite(name, extractor, images, on_step, ctx.check)
+
+@st.cache_resource
+def get_saved_model(name, saved, tflite):
+    """(classifier, TFLite extractor or None) for a saved model; `saved` and `tflite` key reloads after changes."""
+    model, _ = load_model(name)
+    return model, load_extractor(name)
+
+def classify_job(ctx, sources, model, extractor):
+    """Background job: classify uploaded images / ZIPs chunk by chunk; returns CSV text."""
+    total = count_images(sources)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["file", "predicted"] + [f"Class {i+1}" for i in range(model.num_classes)])
+    done = 0
+    for names, features in iter_feature_chunks(extractor, iter_images(sources)):
+        ctx.check()
+        probs = model.predict(features)
+        for name, p in zip(names, probs):
+            writer.writerow([name, f"Class {int(np.argmax(p))+1}"] + [f"{x:.4f}" for x in p])
+        done += len(names)
+        ctx.progress(done / max(total, 1), f"Classified {done}/{total} images")
+    return out.getvalue()
+
+INSTANT_MODES = {"Nearest centroid (instant)": "centroid", "k-nearest neighbours (instant)": "knn"}
+SAVED_MODE = "Saved model"
+
+def update_prototypes(data, num_classes, feature_extractor):
+    """Session PrototypeClassifier with every uploaded image added; only new images are extracted."""
+    uploaded = {}
+    for class_id, files in data.items():
+        for f in files or []:
+            raw = f.getvalue()
+            uploaded[(image_key(raw), class_id)] = raw
+    clf = st.session_state.get("prototypes")
+    if clf is None or clf.num_classes != num_classes or not clf.labelled <= uploaded.keys():
+        # Classes changed or images were removed: rebuild (features come from the cache)
+        clf = PrototypeClassifier(num_classes)
+        st.session_state["prototypes"] = clf
+    new = [pair for pair in uploaded if pair not in clf.labelled]
+    if new:
+        with st.spinner(f"Adding {len(new)} image(s)..."):
+            feats = cached_features(feature_extractor, [uploaded[p] for p in new])
+            clf.add(feats, [c for _, c in new], [k for k, _ in new])
+    return clf
 
 def run():
     st.title("🧠 Teachable Machine - Streamlit Version")
@@ -21,76 +107,83 @@ def run():
         )
         data[i] = files
 
-    # Step 2: Load MobileNetV2
-    @st.cache_resource
-    def load_feature_extractor():
-        base = tf.keras.applications.MobileNetV2(
-            input_shape=(224,224,3),
-            include_top=False,
-            weights="imagenet",
-            pooling="avg"
-        )
-        return base
-
-    feature_extractor = load_feature_extractor()
-
-    # Step 3: Preprocess
-    def preprocess(img):
-        img = img.resize((224,224))
-        img = np.array(img) / 255.0
-        return np.expand_dims(img, axis=0)
-
-    # Step 4: Train Model
-    if st.button("Train Model"):
-        X = []
-        Y = []
-
-        st.write("Processing images...")
-
-        for class_id, files in data.items():
-            if files:
-                for file in files:
-                    img = Image.open(file).convert("RGB")
-                    tensor = preprocess(img)
-
-                    features = feature_extractor(tensor)
-                    X.append(features.numpy()[0])
-                    Y.append(class_id)
-
-        X = np.array(X)
-        Y = tf.keras.utils.to_categorical(Y, num_classes)
-
-        st.write("Training... Please wait.")
-
-        model = tf.keras.Sequential([
-            tf.keras.layers.Input(shape=(1280,)),
-            tf.keras.layers.Dense(128, activation="relu"),
-            tf.keras.layers.Dense(num_classes, activation="softmax")
-        ])
-
-        model.compile(
-            optimizer=tf.keras.optimizers.Adam(1e-4),
-            loss="categorical_crossentropy",
-            metrics=["accuracy"]
-        )
-
-        model.fit(X, Y, epochs=10, batch_size=8, verbose=0)
-
-        st.success("🎉 Training Completed!")
-        st.session_state["model"] = model
+    # Step 2: Load MobileNetV2 (usually already warmed up after login)
+    with st.spinner("Loading MobileNetV2..."):
+        feature_extractor = get_extractor()
+
+    # Step 3: Train Model (on the shared job queue) or use an instant classifier
+    modes = ["Neural network (train)", *INSTANT_MODES] + ([SAVED_MODE] if list_models() else [])
+    mode = st.radio("Classifier", modes)
+    extractor = feature_extractor
+    if mode == SAVED_MODE:
+        name = st.selectbox("Saved model", list_models())
+        meta = load_meta(name)
+        try:
+            model, tflite = get_saved_model(name, meta["saved"], has_tflite(name))
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        st.caption(f"{meta['kind']} head · {meta['num_classes']} classes")
+        if tflite is not None and st.checkbox("Use int8 TFLite extractor", value=True):
+            extractor = tflite
+    elif mode in INSTANT_MODES:
+        clf = update_prototypes(data, num_classes, feature_extractor)
+        clf.mode = INSTANT_MODES[mode]
+        if clf.mode == "knn":
+            clf.k = st.slider("Neighbours (k)", 1, 25, KNN_K)
+        st.caption(f"⚡ No training needed — {len(clf)} image(s) ready.")
+        model = clf if len(clf) else None
+    else:
+        if st.button("Train Model"):
+            samples = [(class_id, f.getvalue()) for class_id, files in data.items() for f in (files or [])]
+            st.session_state["train_job"] = get_queue().submit(
+                "train", f"Training on {len(samples)} images", train_job,
+                samples, num_classes, feature_extractor,
+            )
+
+        if "train_job" in st.session_state:
+            job = render_job(st.session_state["train_job"], "train")
+            if job and job["status"] == "done":
+                st.session_state["model"] = get_queue().pop_result(st.session_state.pop("train_job"))
+                st.success("🎉 Training Completed!")
+            elif job is None or job["status"] in ("failed", "cancelled"):
+                st.session_state.pop("train_job")
+        model = st.session_state.get("model")
+
+    # Step 4: Save Model
+    if mode != SAVED_MODE and model is not None:
+        with st.expander("💾 Save model"):
+            save_name = st.text_input("Model name", "my_model")
+            quantize = st.checkbox("Also export an int8 TFLite extractor (slower to save, faster to predict)")
+            if st.button("Save"):
+                save_model(save_name, model)
+                st.success(f"✅ Saved {save_name} — pick 'Saved model' to use it after a restart.")
+                images = [f.getvalue() for files in data.values() for f in (files or [])]
+                if quantize and images:
+                    st.session_state["export_job"] = get_queue().submit(
+                        "export", f"Exporting TFLite extractor for {save_name}", export_job,
+                        save_name, feature_extractor, images,
+                    )
+                elif quantize:
+                    st.warning("Upload some class images first — they calibrate the int8 quantization.")
+            if "export_job" in st.session_state:
+                job = render_job(st.session_state["export_job"], "export")
+                if job is None or job["status"] not in ACTIVE:
+                    if job and job["status"] == "done":
+                        st.success("✅ TFLite extractor exported.")
+                    get_queue().pop_result(st.session_state.pop("export_job"))
 
     # Step 5: Prediction
     st.header("🔍 Predict New Image")
 
     predict_file = st.file_uploader("Upload image to classify", type=['jpg','png','jpeg'])
 
-    if predict_file and "model" in st.session_state:
+    if predict_file and model is not None:
         image = Image.open(predict_file).convert("RGB")
         st.image(image, width=250)
 
-        tensor = preprocess(image)
-        features = feature_extractor(tensor)
-        pred = st.session_state["model"].predict(features)[0]
+        features = extract_features(extractor, [predict_file.getvalue()])
+        pred = model.predict(features)[0]
 
         class_id = np.argmax(pred)
 
@@ -99,3 +192,31 @@ def run():
 
     else:
         st.info("Upload image and train model first.")
+
+    # Step 6: Batch Classification
+    st.header("📂 Batch Classify")
+    batch_files = st.file_uploader(
+        "Upload images or a ZIP of images",
+        accept_multiple_files=True,
+        type=['jpg','png','jpeg','zip'],
+        key="batch"
+    )
+    if batch_files and model is not None and st.button("Classify all"):
+        st.session_state.pop("batch_csv", None)
+        sources = [(f.name, f.getvalue()) for f in batch_files]
+        st.session_state["batch_job"] = get_queue().submit(
+            "classify", f"Classifying {count_images(sources)} images", classify_job,
+            sources, model, extractor,
+        )
+
+    if "batch_job" in st.session_state:
+        job = render_job(st.session_state["batch_job"], "batch")
+        if job and job["status"] == "done":
+            st.session_state["batch_csv"] = get_queue().pop_result(st.session_state.pop("batch_job"))
+        elif job is None or job["status"] not in ACTIVE:
+            st.session_state.pop("batch_job")
+
+    if st.session_state.get("batch_csv"):
+        st.success("Batch classification done ✅")
+        st.download_button("Download CSV", st.session_state["batch_csv"].encode("utf-8"),
+                           file_name="predictions.csv", mime="text/csv")
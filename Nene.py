@@ -1,9 +1,16 @@
 import streamlit as st
 import os
+import time
 from datetime import datetime
 from pydub import AudioSegment
 import speech_recognition as sr
-import zipfile
+from zip_export import render_export
+from text_search import get_index, render_search
+from file_browser import refresh_files, render_file_list
+from transcriber import is_test_backend, transcribe_file, user_backends
+from speech_history import SpeechHistory, audio_hash
+from job_queue import ACTIVE, get_queue
+from job_status import render_job
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 AUDIO_DIR = os.path.join(BASE_DIR, "audios")
@@ -18,50 +25,83 @@ os.makedirs(EXPORT_DIR, exist_ok=True)
 def convert_to_wav(path):
     name, ext = os.path.splitext(path)
     if ext.lower() != ".wav":
-        sound = AudioSegment.from_file(path)
         new_path = name + ".wav"
+        sound = AudioSegment.from_file(path)
         sound.export(new_path, format="wav")
         return new_path
     return path
 
-def transcribe(path):
-    r = sr.Recognizer()
+UNRECOGNIZED = "[Could not understand]"
+HISTORY_PAGE = 20
+POLL_SECONDS = 1       # rerun interval while a transcription job is running
+
+@st.cache_resource
+def get_history():
+    return SpeechHistory()
+
+def transcribe(path, backend="google", on_partial=None):
+    # Split on silence and recognize the segments in parallel
     try:
-        with sr.AudioFile(path) as src:
-            audio = r.record(src)
-        return r.recognize_google(audio)
+        text = transcribe_file(path, backend, on_partial=on_partial)
     except:
-        return "[Could not understand]"
+        text = ""
+    return text or UNRECOGNIZED
+
+def live_progress():
+    """Partial-results callback that shows the transcript as segments finish."""
+    box = st.empty()
+    def show(text, done, total):
+        box.info(f"Transcribing... {done}/{total} segments\n\n{text}")
+    return box, show
+
+def transcribe_job(ctx, history, name, digest, data, backend):
+    """Background job: store and convert an upload, transcribe it and record it in history."""
+    raw_path = audio_path = history.find_wav(digest)
+    if not audio_path:
+        # Stored by content hash: a different upload with the same file name never overwrites it
+        raw_path = os.path.join(AUDIO_DIR, digest + os.path.splitext(name)[1].lower())
+        with open(raw_path, "wb") as f:
+            f.write(data)
+        ctx.progress(0.0, "Converting to WAV...")
+        audio_path = convert_to_wav(raw_path)
+    ctx.check()
+
+    def show(partial, done, total):
+        ctx.check()
+        ctx.progress(done / total, f"{done}/{total} segments — {partial[-300:]}")
+
+    text = transcribe(audio_path, backend, show)
+    ctx.check()
+    if text != UNRECOGNIZED and not is_test_backend(backend):
+        history.record(name, digest, raw_path, audio_path, text, backend)
+    return audio_path, text
 
 def save_text(name, text):
     safe = "".join(c for c in name if c.isalnum() or c in ("_", "-"))
     path = os.path.join(TEXT_DIR, safe + ".txt")
     with open(path, "w", encoding="utf-8") as f:
         f.write(text)
+    get_index().index_file(path)
+    refresh_files()
     return path
 
-def list_texts():
-    return [f for f in os.listdir(TEXT_DIR) if f.endswith(".txt")]
-
 def delete_file(path):
     if os.path.exists(path):
         os.remove(path)
-
-def export_all():
-    zip_path = os.path.join(EXPORT_DIR, "all_texts.zip")
-    with zipfile.ZipFile(zip_path, "w") as z:
-        for f in list_texts():
-            z.write(os.path.join(TEXT_DIR, f), f)
-    return zip_path
+    get_index().remove_file(path)
+    refresh_files()
 
 # ---------------- RUN FUNCTION ----------------
 def run():
     st.title("🎙️ Voice to Text App")
 
     mode = st.radio("Select mode", ["Record Locally", "Upload Audio"])
+    backend = st.selectbox("Recognizer", user_backends())
 
+    history = get_history()
     audio_path = None
     text = ""
+    polling = False
 
     # ----------- RECORD LOCALLY -----------
     if mode == "Record Locally":
@@ -77,10 +117,15 @@ def run():
 
                 t = datetime.now().strftime("%Y%m%d_%H%M%S")
                 audio_path = os.path.join(AUDIO_DIR, f"record_{t}.wav")
+                wav_data = audio.get_wav_data()
                 with open(audio_path, "wb") as f:
-                    f.write(audio.get_wav_data())
+                    f.write(wav_data)
 
-                text = transcribe(audio_path)
+                box, show = live_progress()
+                text = transcribe(audio_path, backend, show)
+                box.empty()
+                if text != UNRECOGNIZED and not is_test_backend(backend):
+                    history.record(os.path.basename(audio_path), audio_hash(wav_data), audio_path, audio_path, text, backend)
                 st.success("✅ Recording completed")
 
                 st.audio(audio_path)
@@ -93,15 +138,40 @@ def run():
     else:
         file = st.file_uploader("Upload audio", type=["wav", "mp3"])
         if file:
-            audio_path = os.path.join(AUDIO_DIR, file.name)
-            with open(audio_path, "wb") as f:
-                f.write(file.getbuffer())
-
-            audio_path = convert_to_wav(audio_path)
-            st.audio(audio_path)
-
-            text = transcribe(audio_path)
-            st.text_area("Generated Text", text, height=150)
+            data = file.getvalue()
+            digest = audio_hash(data)
+            hit = history.lookup(digest, backend)
+            if hit:
+                # Same audio seen before: reuse its WAV and transcript
+                audio_path, text = hit["wav_path"], hit["text"]
+                st.audio(audio_path)
+                st.caption("⚡ Loaded from history — this audio was transcribed before.")
+            else:
+                # Transcribe on the shared job queue so the page stays responsive
+                queue = get_queue()
+                jobs = st.session_state.setdefault("transcribe_jobs", {})
+                results = st.session_state.setdefault("transcribe_results", {})
+                job_key = (digest, backend)
+                if job_key not in jobs and job_key not in results:
+                    jobs[job_key] = queue.submit(
+                        "transcribe", f"Transcribing {file.name}", transcribe_job,
+                        history, file.name, digest, data, backend,
+                    )
+                if job_key in jobs:
+                    job = render_job(jobs[job_key], "transcribe")
+                    polling = bool(job) and job["status"] in ACTIVE
+                    if job and job["status"] == "done":
+                        results[job_key] = queue.pop_result(jobs.pop(job_key)) or (None, UNRECOGNIZED)
+                    elif job is None or job["status"] in ("failed", "cancelled"):
+                        if st.button("Transcribe again"):
+                            jobs.pop(job_key)
+                            st.rerun()
+                if job_key in results:
+                    audio_path, text = results[job_key]
+                    if audio_path:
+                        st.audio(audio_path)
+            if text:
+                st.text_area("Generated Text", text, height=150)
 
     # ----------- SAVE TEXT -----------
     if audio_path and text:
@@ -110,24 +180,32 @@ def run():
             path = save_text(filename, text)
             st.success(f"✅ Saved: {path}")
 
+    # ----------- TRANSCRIPTION HISTORY -----------
+    st.header("🕘 Transcription History")
+    total = history.count()
+    if total:
+        pages = (total - 1) // HISTORY_PAGE + 1
+        page = st.number_input("History page", 1, pages, 1, key="history_page") if pages > 1 else 1
+        for entry in history.recent(HISTORY_PAGE, (page - 1) * HISTORY_PAGE):
+            with st.expander(f"{entry['name']} — {entry['timestamp']} ({entry['backend']})"):
+                st.text_area("Transcript", history.text(entry["id"]), height=150, key=f"hist_{entry['id']}")
+    else:
+        st.caption("No transcriptions yet.")
+
+    # ----------- SEARCH -----------
+    st.header("🔎 Search Notes & Transcripts")
+    render_search("texts_search")
+
     # ----------- HISTORY -----------
     st.header("📜 Saved Text Files")
-    files = list_texts()
-    for i, f in enumerate(files):
-        full = os.path.join(TEXT_DIR, f)
-        with open(full, "r", encoding="utf-8") as file_data:
-            content = file_data.read()
-
-        with st.expander(f):
-            st.text_area("Preview", content, height=200, key=f"text_{i}")
-            if st.button(f"🗑️ Delete {f}", key=f"del_{i}"):
-                delete_file(full)
-                st.experimental_rerun()
+    render_file_list(TEXT_DIR, "texts", delete_file)
 
     # ----------- EXPORT ALL -----------
     st.header("📦 Export All Text Files")
-    if st.button("Export as ZIP", key="export_zip"):
-        zip_file = export_all()
-        st.success("ZIP ready ✅")
-        with open(zip_file, "rb") as f:
-            st.download_button("Download ZIP", f, file_name="all_texts.zip")
+    render_export(TEXT_DIR, "texts_export")
+
+    # Keep the partial transcript and progress bar moving without Refresh clicks;
+    # the rest of the page is drawn first so it stays usable between polls
+    if polling:
+        time.sleep(POLL_SECONDS)
+        st.rerun()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB = os.path.join(BASE_DIR, "cache", "answers.db")
+SIMILARITY_THRESHOLD = 0.92   # cosine similarity needed to reuse an answer
+TTL_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 5000
+
+# ---------------- Helpers ----------------
+def doc_set_key(doc_keys, model, *settings):
+    """Hash of a set of document content hashes, the query embedding model and answer settings.
+
+    `settings` (e.g. retrieval mode and context budget) change which
+    chunks reach the answer, so answers built under other settings are
+    never reused.
+    """
+    h = hashlib.sha256(model.encode("utf-8"))
+    for value in settings:
+        h.update(b"\1" + str(value).encode("utf-8"))
+    for key in sorted(doc_keys):
+        h.update(b"\0" + key.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------------- Answer Cache ----------------
+class AnswerCache:
+    """Semantic cache of Doubt Solver answers, stored in SQLite.
+
+    Entries are scoped to a document set and matched by cosine similarity
+    of the query embedding, so near-identical questions about the same
+    PDFs reuse one answer. Entries expire after `ttl` seconds and the
+    least recently used ones are evicted above `max_entries`. Being a
+    file, the cache survives Streamlit reruns and is shared by processes.
+    """
+
+    def __init__(self, path=CACHE_DB, threshold=SIMILARITY_THRESHOLD, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_set TEXT,
+                question TEXT,
+                qvec BLOB,
+                payload TEXT,
+                created REAL,
+                last_used REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_doc_set ON answers(doc_set, created)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers(last_used)")
+        self._db.commit()
+
+    def get(self, doc_set, qvec):
+        """Cached payload for the closest earlier question, or None if none is similar enough."""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, qvec, payload FROM answers WHERE doc_set=? AND created>?",
+                (doc_set, now - self.ttl),
+            ).fetchall()
+            if not rows:
+                return None
+            q = np.asarray(qvec, dtype=np.float32)
+            mat = np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+            sims = mat @ q / (np.linalg.norm(mat, axis=1) * np.linalg.norm(q) + 1e-9)
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self._db.execute("UPDATE answers SET last_used=? WHERE id=?", (now, rows[best][0]))
+            self._db.commit()
+            return json.loads(rows[best][2])
+
+    def put(self, doc_set, question, qvec, payload):
+        """Store a JSON-serializable payload for `question`, then expire and evict."""
+        now = time.time()
+        blob = np.asarray(qvec, dtype=np.float32).tobytes()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO answers (doc_set, question, qvec, payload, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_set, question, blob, json.dumps(payload), now, now),
+            )
+            self._db.execute("DELETE FROM answers WHERE created<=?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
@@ -0,0 +1,171 @@
+"""Offline retrieval benchmark for the Doubt Solver (1_rag_solver).
+
+Builds a VectorIndex over synthetic corpora (and the notes bundled in
+texts/ and notes/) and reports build time, memory, p50/p99 query
+latency and recall@k against brute-force search.
+
+    python bench_rag.py                       # 1k, 100k and 1M chunks
+    python bench_rag.py --sizes 1000 100000 --nprobe 4 8 16 --out bench_output.txt
+"""
+import argparse
+import os
+import time
+import tracemalloc
+import numpy as np
+from bm25_index import BM25Index
+from embeddings import EMBED_DIM, embed_batch
+from pdf_ingest import chunk_text
+from vector_index import IVF_THRESHOLD, VectorIndex, normalize, top_k
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLED_DIRS = [os.path.join(BASE_DIR, "texts"), os.path.join(BASE_DIR, "notes")]
+ADD_BLOCK = 100_000
+
+# ---------------- Corpora ----------------
+def topic_centers(dim=EMBED_DIM, topics=256, seed=0):
+    return normalize(np.random.default_rng(seed).standard_normal((topics, dim)))
+
+def _sample(centers, m, rng):
+    dim = centers.shape[1]
+    block = centers[rng.integers(0, len(centers), m)] + 0.6 * rng.standard_normal((m, dim)) / np.sqrt(dim)
+    return normalize(block)
+
+def synthetic_corpus(n, dim=EMBED_DIM, topics=256, seed=0):
+    """Yield blocks of clustered unit vectors, roughly shaped like chunk embeddings."""
+    centers = topic_centers(dim, topics)
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, ADD_BLOCK):
+        yield _sample(centers, min(ADD_BLOCK, n - start), rng)
+
+def synthetic_queries(num, dim=EMBED_DIM, topics=256, seed=1):
+    """Queries around the corpus's topic centres; only the sampling noise uses a different seed."""
+    return _sample(topic_centers(dim, topics), num, np.random.default_rng(seed))
+
+def bundled_chunks():
+    chunks = []
+    for folder in BUNDLED_DIRS:
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".txt"):
+                with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+                    chunks.extend(chunk_text(f.read()))
+    return chunks
+
+
+# ---------------- Measurements ----------------
+def percentile_ms(samples, p):
+    return float(np.percentile(samples, p) * 1000) if samples else 0.0
+
+def index_bytes(index):
+    total = index._vecs.nbytes + index._ids.nbytes + index._assign.nbytes + index._alive.nbytes
+    if index._centroids is not None:
+        total += index._centroids.nbytes
+    return total
+
+def bench_index(name, blocks, queries, k, ivf_threshold, nprobes):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = VectorIndex(ivf_threshold=0)
+    for block in blocks:
+        index.add(block)
+    if ivf_threshold and len(index) >= ivf_threshold:
+        index.build_ivf()
+    build = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    truth = [set(index.ids[top_k(index.vectors @ q, k)].tolist()) for q in queries]
+    rows = []
+    for nprobe in (nprobes if index.is_ivf else [None]):
+        lat, hits = [], 0
+        for q, gt in zip(queries, truth):
+            t = time.perf_counter()
+            ids, _ = index.search(q, k, nprobe=nprobe)
+            lat.append(time.perf_counter() - t)
+            hits += len(gt & set(ids.tolist()))
+        rows.append({
+            "corpus": name,
+            "chunks": len(index),
+            "mode": f"ivf nprobe={nprobe}" if nprobe else "flat",
+            "build_s": build,
+            "index_mb": index_bytes(index) / 2 ** 20,
+            "peak_mb": peak / 2 ** 20,
+            "p50_ms": percentile_ms(lat, 50),
+            "p99_ms": percentile_ms(lat, 99),
+            "recall": hits / (k * len(queries)),
+        })
+    return rows
+
+def bench_bm25(chunks, queries, k):
+    t0 = time.perf_counter()
+    index = BM25Index()
+    for c in chunks:
+        index.add(c)
+    build = time.perf_counter() - t0
+    lat = []
+    for q in queries:
+        t = time.perf_counter()
+        index.search(q, k)
+        lat.append(time.perf_counter() - t)
+    return {
+        "corpus": "bundled",
+        "chunks": len(index),
+        "mode": "bm25",
+        "build_s": build,
+        "index_mb": 0.0,
+        "peak_mb": 0.0,
+        "p50_ms": percentile_ms(lat, 50),
+        "p99_ms": percentile_ms(lat, 99),
+        "recall": float("nan"),
+    }
+
+def format_rows(rows):
+    header = f"{'corpus':<10}{'chunks':>10}  {'mode':<16}{'build s':>9}{'index MB':>10}{'peak MB':>9}{'p50 ms':>9}{'p99 ms':>9}{'recall':>8}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['corpus']:<10}{r['chunks']:>10}  {r['mode']:<16}{r['build_s']:>9.2f}{r['index_mb']:>10.1f}"
+            f"{r['peak_mb']:>9.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['recall']:>8.3f}"
+        )
+    return "\n".join(lines)
+
+
+# ---------------- Main ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=EMBED_DIM)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ivf-threshold", type=int, default=IVF_THRESHOLD)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8])
+    parser.add_argument("--no-bundled", action="store_true", help="skip the texts/ and notes/ corpus")
+    parser.add_argument("--out", help="also write the table to this file")
+    args = parser.parse_args(argv)
+
+    rows = []
+    queries = synthetic_queries(args.queries, args.dim)
+    for n in args.sizes:
+        print(f"... synthetic corpus, {n} chunks", flush=True)
+        rows += bench_index("synthetic", synthetic_corpus(n, args.dim), queries, args.k, args.ivf_threshold, args.nprobe)
+
+    if not args.no_bundled:
+        chunks = bundled_chunks()
+        if chunks:
+            print(f"... bundled corpus, {len(chunks)} chunks", flush=True)
+            vecs = embed_batch(chunks)
+            sample = [chunks[i] for i in np.linspace(0, len(chunks) - 1, min(args.queries, len(chunks))).astype(int)]
+            qvecs = embed_batch(sample)
+            rows += bench_index("bundled", [vecs], qvecs, args.k, args.ivf_threshold, args.nprobe)
+            rows.append(bench_bm25(chunks, sample, args.k))
+
+    table = format_rows(rows)
+    print(table)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(table + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import math
+import re
+from array import array
+import numpy as np
+
+K1 = 1.5
+B = 0.75
+RRF_K = 60   # reciprocal-rank-fusion damping constant
+COMPACT_RATIO = 0.25   # drop dead postings once this fraction of chunks is removed
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where",
+    "which", "who", "why", "with",
+}
+
+# ---------------- Helpers ----------------
+def tokenize(text):
+    return [t for t in re.findall(r"\w+", text.lower()) if t not in STOPWORDS]
+
+def rrf_fuse(rankings, k=RRF_K):
+    """Reciprocal rank fusion of several ranked id lists; returns [(id, score)] best first."""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda kv: -kv[1])
+
+
+# ---------------- BM25 Index ----------------
+class BM25Index:
+    """Inverted index with BM25 scoring.
+
+    Each term keeps its postings as two compact `array` columns (doc id,
+    term frequency); a query turns the postings of its terms into NumPy
+    views and scores them with vectorized BM25.
+
+    Removed chunks are tombstoned and score zero; their postings are
+    dropped lazily by `compact`. Doc ids never change.
+    """
+
+    def __init__(self, k1=K1, b=B):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.post_docs = []
+        self.post_tfs = []
+        self.doc_len = array("i")
+        self.dead = bytearray()
+        self.num_dead = 0
+        self.num_compacted = 0
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_len) - self.num_dead
+
+    def add(self, text):
+        """Index one chunk; returns its doc id (position)."""
+        doc_id = len(self.doc_len)
+        counts = {}
+        tokens = tokenize(text)
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, tf in counts.items():
+            term = self.vocab.get(tok)
+            if term is None:
+                term = self.vocab[tok] = len(self.post_docs)
+                self.post_docs.append(array("i"))
+                self.post_tfs.append(array("i"))
+            self.post_docs[term].append(doc_id)
+            self.post_tfs[term].append(tf)
+        self.doc_len.append(len(tokens))
+        self.dead.append(0)
+        self.total_len += len(tokens)
+        return doc_id
+
+    def remove(self, doc_ids):
+        """Tombstone chunks; compacts the postings when enough are dead."""
+        for doc_id in doc_ids:
+            if not self.dead[doc_id]:
+                self.dead[doc_id] = 1
+                self.num_dead += 1
+                self.total_len -= self.doc_len[doc_id]
+        if self.num_dead - self.num_compacted > COMPACT_RATIO * len(self):
+            self.compact()
+
+    def compact(self):
+        """Drop postings of removed chunks (ids stay the same)."""
+        if self.num_dead == self.num_compacted:
+            return
+        dead = np.frombuffer(self.dead, dtype=np.uint8).astype(bool)
+        for term in range(len(self.post_docs)):
+            docs = np.frombuffer(self.post_docs[term], dtype=np.int32)
+            keep = ~dead[docs]
+            if keep.all():
+                continue
+            tfs = np.frombuffer(self.post_tfs[term], dtype=np.int32)
+            self.post_docs[term] = array("i", docs[keep].tobytes())
+            self.post_tfs[term] = array("i", tfs[keep].tobytes())
+        self.num_compacted = self.num_dead
+
+    def scores(self, query):
+        """BM25 score of every indexed chunk for `query` (float32 array)."""
+        n = len(self.doc_len)
+        out = np.zeros(n, dtype=np.float32)
+        live = n - self.num_dead
+        if live == 0:
+            return out
+        doc_len = np.frombuffer(self.doc_len, dtype=np.int32).astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_len / (self.total_len / live or 1.0))
+        # Postings of tombstoned chunks not yet compacted must not count toward df
+        dead = np.frombuffer(self.dead, dtype=np.uint8).astype(bool) if self.num_dead > self.num_compacted else None
+        for tok in set(tokenize(query)):
+            term = self.vocab.get(tok)
+            if term is None:
+                continue
+            docs = np.frombuffer(self.post_docs[term], dtype=np.int32)
+            tfs = np.frombuffer(self.post_tfs[term], dtype=np.int32).astype(np.float32)
+            df = len(docs) if dead is None else int(np.count_nonzero(~dead[docs]))
+            idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+            out[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        if dead is not None:
+            out[dead] = 0
+        return out
+
+    def search(self, query, k=5):
+        """Return (doc_ids, scores) of the k best-matching chunks with a positive score."""
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return hits, scores[hits]
@@ -0,0 +1,37 @@
+import re
+from embeddings import estimate_tokens
+
+CONTEXT_TOKENS = 1500   # default prompt budget for retrieved context
+SHINGLE = 5             # words per shingle when checking overlap
+MIN_NOVELTY = 0.5       # skip chunks whose shingles are mostly already packed
+
+# ---------------- Helpers ----------------
+def shingles(text, n=SHINGLE):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+def pack_context(hits, max_tokens=CONTEXT_TOKENS, min_novelty=MIN_NOVELTY):
+    """Pick ranked hits for the prompt within a token budget.
+
+    `hits` are (text, page, doc, score) tuples, best first. A hit is
+    skipped when it would overflow the budget (smaller later hits may
+    still fit) or when most of its word shingles are already covered by
+    packed chunks, which drops duplicates and overlapping neighbours.
+    Returns (context string, packed hits).
+    """
+    packed, seen, used = [], set(), 0
+    for hit in hits:
+        text = hit[0]
+        cost = estimate_tokens(text)
+        if used + cost > max_tokens:
+            continue
+        sh = shingles(text)
+        if sh and len(sh - seen) / len(sh) < min_novelty:
+            continue
+        packed.append(hit)
+        seen |= sh
+        used += cost
+    context = "\n\n".join(f"[{doc}, page {page}]\n{text}" for text, page, doc, _ in packed)
+    return context, packed
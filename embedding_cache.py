@@ -0,0 +1,164 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache", "embeddings")
+MAX_CACHE_BYTES = 2 * 1024 ** 3   # evict least-recently-used shards above this
+LOOKUP_BATCH = 500                 # keys per "IN (...)" query
+MAX_OPEN_SHARDS = 64               # memory maps kept open (each holds a file descriptor)
+
+# ---------------- Helpers ----------------
+def cache_key(text, model):
+    """Content address of one chunk embedded by `model` (a model name)."""
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------------- Embedding Cache ----------------
+class EmbeddingCache:
+    """On-disk embedding cache keyed by chunk-text hash and model name.
+
+    Vectors are written in batches as `.npy` shards and read back
+    memory-mapped. `index.db` maps each key to (shard, row) and tracks
+    shard sizes and last use, so whole shards are evicted LRU-first once
+    the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = OrderedDict()   # shard name -> memory map, least recently used first
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS shards (
+                name TEXT PRIMARY KEY,
+                rows INTEGER,
+                bytes INTEGER,
+                last_used REAL
+            )""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS keys (
+                key TEXT PRIMARY KEY,
+                shard TEXT,
+                row INTEGER
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS keys_shard ON keys(shard)")
+        self._db.commit()
+
+    def _shard(self, name):
+        arr = self._maps.get(name)
+        if arr is None:
+            arr = np.load(os.path.join(self.root, name), mmap_mode="r")
+            self._maps[name] = arr
+            if len(self._maps) > MAX_OPEN_SHARDS:
+                self._maps.popitem(last=False)   # rows are copied out, so nothing else holds the map
+        else:
+            self._maps.move_to_end(name)
+        return arr
+
+    def _lookup(self, keys):
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            marks = ",".join("?" * len(batch))
+            for key, shard, row in self._db.execute(
+                f"SELECT key, shard, row FROM keys WHERE key IN ({marks})", batch
+            ):
+                found[key] = (shard, row)
+        return found
+
+    def get_many(self, texts, model):
+        """Return a list with a cached vector (or None) for each text."""
+        keys = [cache_key(t, model) for t in texts]
+        out = [None] * len(texts)
+        with self._lock:
+            found = self._lookup(keys)
+            used = set()
+            for i, key in enumerate(keys):
+                if key not in found:
+                    continue
+                shard, row = found[key]
+                try:
+                    out[i] = np.array(self._shard(shard)[row], dtype=np.float32)
+                    used.add(shard)
+                except (OSError, ValueError, IndexError):
+                    pass
+            if used:
+                now = time.time()
+                self._db.executemany("UPDATE shards SET last_used=? WHERE name=?", [(now, s) for s in used])
+                self._db.commit()
+        return out
+
+    def put_many(self, texts, vectors, model):
+        """Store vectors for texts not cached yet as one new shard."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [cache_key(t, model) for t in texts]
+        with self._lock:
+            found = self._lookup(keys)
+            rows, new_keys, seen = [], [], set(found)
+            for i, key in enumerate(keys):
+                if key not in seen:
+                    rows.append(i)
+                    new_keys.append(key)
+                    seen.add(key)
+            if not rows:
+                return
+            name = f"{uuid.uuid4().hex}.npy"
+            path = os.path.join(self.root, name)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, vectors[rows])
+            os.replace(tmp, path)
+
+            self._db.execute(
+                "INSERT INTO shards (name, rows, bytes, last_used) VALUES (?, ?, ?, ?)",
+                (name, len(rows), os.path.getsize(path), time.time()),
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO keys (key, shard, row) VALUES (?, ?, ?)",
+                [(key, name, r) for r, key in enumerate(new_keys)],
+            )
+            self._db.commit()
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM shards").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for name, size in self._db.execute("SELECT name, bytes FROM shards ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM keys WHERE shard=?", (name,))
+            self._db.execute("DELETE FROM shards WHERE name=?", (name,))
+            self._maps.pop(name, None)
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                pass
+            total -= size
+        self._db.commit()
+
+    def get_or_compute(self, texts, model, compute):
+        """Vectors for all texts; misses are computed with `compute(list_of_texts)` and stored."""
+        cached = self.get_many(texts, model)
+        missing = [i for i, v in enumerate(cached) if v is None]
+        if missing:
+            todo = list(dict.fromkeys(texts[i] for i in missing))
+            fresh = np.asarray(compute(todo), dtype=np.float32)
+            self.put_many(todo, fresh, model)
+            by_text = dict(zip(todo, fresh))
+            for i in missing:
+                cached[i] = by_text[texts[i]]
+        if not cached:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(cached)
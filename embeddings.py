@@ -0,0 +1,116 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+EMBED_DIM = 384
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+HASH_MODEL = "hashing-384"
+
+BATCH_TOKENS = 8192    # padded tokens per batch (batch size x longest text)
+MAX_BATCH = 64
+EMBED_WORKERS = 4
+
+_models = {}
+_model_names = {}   # id(model) -> name passed to load_model; models in _models live for the process
+_pool = None
+_pool_lock = threading.Lock()
+
+# ---------------- Helpers ----------------
+def load_model(name=DEFAULT_MODEL):
+    """Load (once per process) a sentence-transformers model, or None if unavailable."""
+    if SentenceTransformer is None:
+        return None
+    if name not in _models:
+        try:
+            _models[name] = SentenceTransformer(name)
+            _model_names[id(_models[name])] = name
+        except Exception:
+            _models[name] = None
+    return _models[name]
+
+def model_name(model):
+    """Name a model was loaded under (SentenceTransformer does not keep it); used in cache keys."""
+    if model is None:
+        return HASH_MODEL
+    return _model_names.get(id(model)) or type(model).__name__
+
+def embedding_dim(model):
+    if model is None:
+        return EMBED_DIM
+    return model.get_sentence_embedding_dimension()
+
+def _tokens(text):
+    words = re.findall(r"\w+", text.lower())
+    return words + [a + " " + b for a, b in zip(words, words[1:])]
+
+def hash_embed(text, dim=EMBED_DIM):
+    """Signed feature-hashing embedding of words and bigrams (no model needed)."""
+    vec = np.zeros(dim, dtype=np.float32)
+    for tok in _tokens(text):
+        h = int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest(), "little")
+        vec[h % dim] += 1.0 if h >> 63 else -1.0
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+def estimate_tokens(text):
+    """Cheap token count estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+def make_batches(texts, max_tokens=BATCH_TOKENS, max_batch=MAX_BATCH):
+    """Group text indices into batches of similar length under a padded-token budget."""
+    order = sorted(range(len(texts)), key=lambda i: estimate_tokens(texts[i]))
+    batches, batch, longest = [], [], 0
+    for i in order:
+        n = estimate_tokens(texts[i])
+        if batch and (len(batch) >= max_batch or (len(batch) + 1) * max(longest, n) > max_tokens):
+            batches.append(batch)
+            batch, longest = [], 0
+        batch.append(i)
+        longest = max(longest, n)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+        return _pool
+
+def _encode(texts, model):
+    if model is None:
+        return np.stack([hash_embed(t) for t in texts])
+    return np.asarray(model.encode(texts, batch_size=len(texts), normalize_embeddings=True), dtype=np.float32)
+
+def embed_batch(texts, model=None, max_tokens=BATCH_TOKENS, max_batch=MAX_BATCH):
+    """Embed a list of texts as one (n, dim) float32 array, in input order.
+
+    Texts are grouped into length-sorted batches sized by token budget and
+    the batches are encoded concurrently on a shared thread pool.
+    """
+    texts = list(texts)
+    out = np.empty((len(texts), embedding_dim(model)), dtype=np.float32)
+    if not texts:
+        return out
+    batches = make_batches(texts, max_tokens, max_batch)
+    if len(batches) == 1:
+        out[batches[0]] = _encode([texts[i] for i in batches[0]], model)
+        return out
+    results = _executor().map(lambda b: _encode([texts[i] for i in b], model), batches)
+    for batch, vecs in zip(batches, results):
+        out[batch] = vecs
+    return out
+
+def embed_text_sbert(text, model=None):
+    """Embed one text as a float32 vector with `model`, falling back to hashing."""
+    return _encode([text], model)[0]
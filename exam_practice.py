@@ -1,12 +1,95 @@
 # File: exam_practice.py
 
 import streamlit as st
-from pypdf import PdfReader
-import docx
 import re
 import random
-from difflib import SequenceMatcher
 from datetime import datetime
+from collections import Counter
+import hashlib
+import math
+from grading import FULL_CREDIT, PARTIAL_CREDIT, grade_batch
+from extract_cache import extract_text
+from question_bank import QuestionBank
+
+# ---------------- Vocabulary Index ------------------
+class VocabIndex:
+    """Words of a document tokenized once, bucketed by length and frequency.
+
+    Distractors for a key word are drawn from the bucket of words with the
+    same shape (length band, log-frequency band), so each sample is O(1)
+    no matter how many questions are generated.
+    """
+
+    def __init__(self, text):
+        counts = Counter(re.findall(r"\w+", text))
+        self.freq = counts
+        self.words = list(counts)
+        self.buckets = {}
+        for w, c in counts.items():
+            self.buckets.setdefault(self.bucket(w, c), []).append(w)
+
+    @staticmethod
+    def bucket(word, count):
+        return min(len(word), 12) // 2, int(math.log2(count))
+
+    def distractors(self, key, n=3, tries=20):
+        """Up to n distinct words shaped like `key`, never `key` itself."""
+        pools = [self.buckets.get(self.bucket(key, self.freq.get(key, 1)), []), self.words]
+        picked = set()
+        for pool in pools:
+            for _ in range(tries):
+                if len(picked) >= n or not pool:
+                    break
+                w = random.choice(pool)
+                if w.lower() != key.lower():
+                    picked.add(w)
+            if len(picked) >= n:
+                break
+        return list(picked)
+
+
+# ---------------- Question Helpers ------------------
+POOL_MCQ = 200     # questions generated per document for the question bank
+POOL_SHORT = 100
+
+def clean_sentences(text):
+    text = re.sub(r'\s+', ' ', text)
+    sents = re.split(r'(?<=[.!?]) +', text)
+    return [s.strip() for s in sents if len(s.split()) > 5]
+
+def choose_key_word(sent):
+    words = re.findall(r"\w+", sent)
+    words = [w for w in words if len(w) > 3]
+    return random.choice(words) if words else None
+
+def generate_mcq_from_sentence(sent, vocab):
+    key = choose_key_word(sent)
+    if not key:
+        return None
+    question = sent.replace(key, "______")
+    correct = key
+
+    distractors = vocab.distractors(key, 3)
+
+    options = [correct] + distractors
+    random.shuffle(options)
+
+    return {"q": question, "options": options, "ans": correct}
+
+def build_question_pool(text, num_mcq=POOL_MCQ, num_short=POOL_SHORT):
+    """Candidate (mcqs, shorts) for a document, at most one of each kind per sentence."""
+    sentences = clean_sentences(text)
+    vocab = VocabIndex(text)
+    mcqs = []
+    for s in random.sample(sentences, len(sentences)):
+        if len(mcqs) >= num_mcq:
+            break
+        q = generate_mcq_from_sentence(s, vocab)
+        if q:
+            mcqs.append(q)
+    shorts = [{"q": s, "ans": s} for s in random.sample(sentences, min(num_short, len(sentences)))]
+    return mcqs, shorts
+
 
 # ---------------- RUN FUNCTION ------------------
 def run():
@@ -14,56 +97,31 @@ def run():
     st.title("📝 Exam Practice — Mock Test Generator")
 
     # ---------------- Helpers ----------------
+    # Parsed text is cached by file hash, so reruns never re-parse the upload
     def extract_text_from_pdf(uploaded_file):
-        content = ""
         try:
-            reader = PdfReader(uploaded_file)
-            for page in reader.pages:
-                txt = page.extract_text()
-                if txt:
-                    content += txt + " "
+            return extract_text(uploaded_file.getvalue(), "pdf")
         except:
             st.error("PDF could not be read.")
-        return content.strip()
+            return ""
 
     def extract_text_from_docx(uploaded_file):
-        content = ""
         try:
-            doc = docx.Document(uploaded_file)
-            for para in doc.paragraphs:
-                content += para.text + " "
+            return extract_text(uploaded_file.getvalue(), "docx")
         except:
             st.error("DOCX could not be read.")
-        return content.strip()
-
-    def clean_sentences(text):
-        text = re.sub(r'\s+', ' ', text)
-        sents = re.split(r'(?<=[.!?]) +', text)
-        return [s.strip() for s in sents if len(s.split()) > 5]
-
-    def choose_key_word(sent):
-        words = re.findall(r"\w+", sent)
-        words = [w for w in words if len(w) > 3]
-        return random.choice(words) if words else None
-
-    def generate_mcq_from_sentence(sent, text_corpus):
-        key = choose_key_word(sent)
-        if not key:
-            return None
-        question = sent.replace(key, "______")
-        correct = key
-
-        words = list(set(re.findall(r"\w+", text_corpus)))
-        words = [w for w in words if w.lower() != key.lower()]
-        distractors = random.sample(words, min(3, len(words)))
+            return ""
 
-        options = [correct] + distractors
-        random.shuffle(options)
+    @st.cache_resource
+    def get_question_bank():
+        return QuestionBank()
 
-        return {"q": question, "options": options, "ans": correct}
-
-    def similarity(a, b):
-        return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    def get_vocab(text, key):
+        # Tokenize each document once; reused by every question and regeneration
+        if st.session_state.get("vocab_key") != key:
+            st.session_state["vocab"] = VocabIndex(text)
+            st.session_state["vocab_key"] = key
+        return st.session_state["vocab"]
 
     # ---------------- Input ----------------
     input_type = st.radio("Input Source", ["Paste Text", "Upload File"], key="exam_input")
@@ -86,6 +144,17 @@ def run():
         st.warning("Please paste text or upload file.")
         st.stop()
 
+    # ---------------- Question Bank ----------------
+    # Uploaded documents get their questions pre-built in the background; pasted
+    # text (often a draft still being edited) only once a test is generated from it
+    doc_hash = hashlib.sha256(text_data.encode("utf-8")).hexdigest()
+    bank = get_question_bank()
+    if input_type == "Upload File":
+        bank.submit(doc_hash, text_data, build_question_pool)
+    bank_status = bank.status(doc_hash)
+    if bank_status == "building":
+        st.caption("⏳ Preparing the question bank for this document...")
+
     # ---------------- Settings ----------------
     c1, c2, c3 = st.columns(3)
     with c1:
@@ -96,22 +165,33 @@ def run():
         mark_mcq = st.selectbox("Marks per MCQ", [1, 2], key="mcq_marks")
         mark_short = st.selectbox("Marks per Short Q", [2, 4, 5], key="short_marks")
 
+    with st.expander("Short answer grading"):
+        full_at = st.slider("Full marks above similarity", 0.0, 1.0, FULL_CREDIT, 0.05, key="full_credit")
+        partial_at = st.slider("Half marks above similarity", 0.0, 1.0, PARTIAL_CREDIT, 0.05, key="partial_credit")
+
     # ---------------- Generate Button ----------------
     if st.button("🎯 Generate Mock Test", key="generate_exam"):
-        sentences = clean_sentences(text_data)
-
         st.session_state["mcqs"] = []
         st.session_state["shorts"] = []
 
-        for _ in range(num_mcq):
-            s = random.choice(sentences)
-            q = generate_mcq_from_sentence(s, text_data)
-            if q:
-                st.session_state["mcqs"].append(q)
-
-        for _ in range(num_short):
-            s = random.choice(sentences)
-            st.session_state["shorts"].append({"q": s, "ans": s})
+        bank.submit(doc_hash, text_data, build_question_pool)
+        if bank.status(doc_hash) == "ready":
+            st.session_state["mcqs"] = bank.sample(doc_hash, "mcq", num_mcq)
+            st.session_state["shorts"] = bank.sample(doc_hash, "short", num_short)
+        else:
+            # Bank not ready yet: generate this test directly
+            sentences = clean_sentences(text_data)
+            vocab = get_vocab(text_data, doc_hash)
+
+            for _ in range(num_mcq):
+                s = random.choice(sentences)
+                q = generate_mcq_from_sentence(s, vocab)
+                if q:
+                    st.session_state["mcqs"].append(q)
+
+            for _ in range(num_short):
+                s = random.choice(sentences)
+                st.session_state["shorts"].append({"q": s, "ans": s})
 
         st.session_state["test_ready"] = True
         st.success("✅ Mock test generated. Scroll down ⬇")
@@ -149,13 +229,13 @@ def run():
                 else:
                     st.error(f"Q{i+1} ❌ Wrong | Correct: {q['ans']}")
 
-            # Short Result
-            for i, q in enumerate(st.session_state["shorts"]):
-                score = similarity(user_short[i], q["ans"])
-                if score > 0.7:
+            # Short Result (all answers scored in one batch)
+            _, levels = grade_batch(user_short, [q["ans"] for q in st.session_state["shorts"]], full_at, partial_at)
+            for i, level in enumerate(levels):
+                if level == 2:
                     total += mark_short
                     st.success(f"S{i+1} ✅ Good Answer")
-                elif score > 0.4:
+                elif level == 1:
                     total += mark_short // 2
                     st.warning(f"S{i+1} ⚠️ Partial Answer")
                 else:
@@ -0,0 +1,81 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import docx
+from pypdf import PdfReader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache", "extracted")
+MAX_CACHE_BYTES = 500 * 1024 ** 2   # evict least recently used files above this
+
+_lock = threading.Lock()
+
+# ---------------- Helpers ----------------
+def file_key(data):
+    """Content hash of an uploaded file's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key + ".json")
+
+def get_pages(key):
+    """Cached page texts for a file hash, or None."""
+    path = _path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        os.utime(path)   # mtime doubles as last-use time for eviction
+        return pages
+    except (OSError, ValueError, KeyError):
+        return None
+
+def put_pages(key, pages):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(key)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"pages": pages, "created": time.time()}, f)
+    os.replace(tmp, path)
+    evict()
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used entries until the store fits in max_bytes."""
+    with _lock:
+        entries = []
+        for e in os.scandir(CACHE_DIR):
+            if e.name.endswith(".json"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+def _read_pdf(data):
+    return [page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages]
+
+def _read_docx(data):
+    return [" ".join(p.text for p in docx.Document(io.BytesIO(data)).paragraphs)]
+
+READERS = {"pdf": _read_pdf, "docx": _read_docx}
+
+def extract_pages(data, ext):
+    """Page texts of a pdf/docx file, parsed at most once per content hash."""
+    key = file_key(data)
+    pages = get_pages(key)
+    if pages is None:
+        pages = READERS[ext.lower()](data)
+        put_pages(key, pages)
+    return pages
+
+def extract_text(data, ext):
+    """Whole-document text: pages are collected first and joined once."""
+    return " ".join(p for p in extract_pages(data, ext) if p).strip()
@@ -0,0 +1,147 @@
+import numpy as np
+from vector_index import normalize
+
+KNN_K = 5
+TEMPERATURE = 0.05       # softmax sharpness over cosine similarities
+
+# ---------------- Helpers ----------------
+def softmax(scores, temperature=TEMPERATURE):
+    z = scores / temperature
+    z -= z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "softmax": lambda x: softmax(x, 1.0),
+}
+
+
+# ---------------- Prototype Classifier ----------------
+class PrototypeClassifier:
+    """Training-free image classifier over MobileNetV2 features.
+
+    Features are L2-normalized into one float32 matrix and summed per
+    class, so adding images is O(new images) and never retrains
+    anything. Prediction is a single matmul: against the class centroids
+    ("centroid" mode) or against every stored image, voting over the k
+    nearest ("knn" mode). `predict` returns class probabilities like a
+    Keras model, so the two can be used interchangeably.
+    """
+
+    def __init__(self, num_classes, mode="centroid", k=KNN_K):
+        self.num_classes = num_classes
+        self.mode = mode
+        self.k = k
+        self.labelled = set()   # (image key, class id) pairs already added
+        self._vecs = None
+        self._labels = np.empty(0, dtype=np.int64)
+        self._sums = None
+        self._counts = np.zeros(num_classes, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, features, labels, keys):
+        """Add feature rows for (key, label) pairs not added before."""
+        rows = [i for i, pair in enumerate(zip(keys, labels)) if pair not in self.labelled]
+        if not rows:
+            return
+        vecs = normalize(np.asarray(features)[rows])
+        labels = np.asarray(labels, dtype=np.int64)[rows]
+        if self._vecs is None:
+            self._vecs = np.empty((max(64, len(rows)), vecs.shape[1]), dtype=np.float32)
+            self._sums = np.zeros((self.num_classes, vecs.shape[1]), dtype=np.float32)
+        need = self._size + len(rows)
+        if need > len(self._vecs):
+            grown = np.empty((max(need, 2 * len(self._vecs)), self._vecs.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._vecs[:self._size]
+            self._vecs = grown
+        self._vecs[self._size:need] = vecs
+        self._labels = np.concatenate([self._labels, labels])
+        self._size = need
+        np.add.at(self._sums, labels, vecs)
+        self._counts += np.bincount(labels, minlength=self.num_classes)
+        self.labelled.update((keys[i], int(labels[n])) for n, i in enumerate(rows))
+
+    @property
+    def centroids(self):
+        return normalize(self._sums)
+
+    def predict(self, features):
+        """(N, num_classes) class probabilities for feature rows."""
+        q = normalize(features)
+        if self.mode == "knn":
+            sims = q @ self._vecs[:self._size].T
+            k = min(self.k, self._size)
+            nearest = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top = np.take_along_axis(sims, nearest, axis=1)
+            weights = np.exp((top - top.max(axis=1, keepdims=True)) / TEMPERATURE)
+            probs = np.zeros((len(q), self.num_classes), dtype=np.float32)
+            np.add.at(probs, (np.arange(len(q))[:, None], self._labels[nearest]), weights)
+            return probs / probs.sum(axis=1, keepdims=True)
+        scores = q @ self.centroids.T
+        scores[:, self._counts == 0] = -np.inf
+        return softmax(scores)
+
+    def state(self):
+        """Arrays that fully describe the classifier, for np.savez."""
+        keys, labels = zip(*sorted(self.labelled)) if self.labelled else ((), ())
+        return {
+            "vecs": self._vecs[:self._size] if self._size else np.empty((0, 0), dtype=np.float32),
+            "labels": self._labels,
+            "sums": self._sums if self._sums is not None else np.empty((0, 0), dtype=np.float32),
+            "counts": self._counts,
+            "keys": np.array(keys, dtype=str),
+            "key_labels": np.array(labels, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, state, mode="centroid", k=KNN_K):
+        clf = cls(len(state["counts"]), mode, k)
+        clf._counts = np.array(state["counts"], dtype=np.int64)
+        clf._labels = np.array(state["labels"], dtype=np.int64)
+        clf._size = len(clf._labels)
+        if clf._size:
+            clf._vecs = np.array(state["vecs"], dtype=np.float32)
+            clf._sums = np.array(state["sums"], dtype=np.float32)
+        clf.labelled = {(str(key), int(c)) for key, c in zip(state["keys"], state["key_labels"])}
+        return clf
+
+
+# ---------------- Dense Head ----------------
+class DenseHead:
+    """The trained Keras Dense head evaluated in NumPy.
+
+    A couple of small matmuls per prediction, without `model.predict`'s
+    per-call graph overhead and without TensorFlow once loaded from disk.
+    """
+
+    def __init__(self, weights, activations):
+        self.weights = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in weights]
+        self.activations = list(activations)
+        self.num_classes = self.weights[-1][0].shape[1]
+
+    @classmethod
+    def from_keras(cls, model):
+        layers = [layer for layer in model.layers if layer.get_weights()]
+        return cls([layer.get_weights() for layer in layers], [layer.get_config()["activation"] for layer in layers])
+
+    def predict(self, features):
+        x = np.asarray(features, dtype=np.float32)
+        for (w, b), act in zip(self.weights, self.activations):
+            x = ACTIVATIONS[act](x @ w + b)
+        return x
+
+    def state(self):
+        out = {"activations": np.array(self.activations, dtype=str)}
+        for i, (w, b) in enumerate(self.weights):
+            out[f"w{i}"], out[f"b{i}"] = w, b
+        return out
+
+    @classmethod
+    def from_state(cls, state):
+        acts = [str(a) for a in state["activations"]]
+        return cls([(state[f"w{i}"], state[f"b{i}"]) for i in range(len(acts))], acts)
@@ -0,0 +1,73 @@
+import streamlit as st
+import os
+from datetime import datetime
+from functools import lru_cache
+
+PAGE_SIZE = 20
+PREVIEW_CHARS = 20_000   # larger files show a truncated preview
+
+# ---------------- Helpers ----------------
+@lru_cache(maxsize=32)
+def _scan(folder, ext, dir_mtime_ns):
+    # dir_mtime_ns is part of the cache key: adding or deleting a file changes it
+    entries = []
+    for e in os.scandir(folder):
+        if e.name.endswith(ext):
+            info = e.stat()
+            entries.append((e.name, info.st_size, info.st_mtime))
+    entries.sort(key=lambda x: -x[2])
+    return tuple(entries)
+
+def list_files(folder, ext=".txt"):
+    """(name, size, mtime) of the folder's files, newest first; rescanned only when the folder changes."""
+    return _scan(folder, ext, os.stat(folder).st_mtime_ns)
+
+def refresh_files():
+    """Forget cached listings; call after writing or deleting a file.
+
+    Overwriting an existing file does not change the folder's mtime, so
+    the listing cache cannot notice it on its own.
+    """
+    _scan.cache_clear()
+
+def read_preview(path, limit=PREVIEW_CHARS):
+    """First `limit` characters of a file and whether it was cut short."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read(limit + 1)
+    return text[:limit], len(text) > limit
+
+def format_size(size):
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+# ---------------- File List UI ----------------
+def render_file_list(folder, key, delete_fn, ext=".txt"):
+    """Paginated list of a folder's files; a file is read only when it is opened."""
+    files = list_files(folder, ext)
+    if not files:
+        st.info("No files yet.")
+        return
+
+    pages = (len(files) - 1) // PAGE_SIZE + 1
+    page = st.number_input(f"Page (of {pages})", 1, pages, 1, key=f"{key}_page") if pages > 1 else 1
+    opened = st.session_state.setdefault(f"{key}_open", set())
+
+    for name, size, mtime in files[(page - 1) * PAGE_SIZE: page * PAGE_SIZE]:
+        full = os.path.join(folder, name)
+        c1, c2, c3 = st.columns([6, 1, 1])
+        c1.markdown(f"**{name}**  \n{format_size(size)} · {datetime.fromtimestamp(mtime):%Y-%m-%d %H:%M}")
+        if c2.button("Close" if name in opened else "Open", key=f"{key}_toggle_{name}"):
+            opened.symmetric_difference_update({name})
+            st.rerun()
+        if c3.button("🗑️", key=f"{key}_del_{name}", help=f"Delete {name}"):
+            delete_fn(full)
+            opened.discard(name)
+            st.rerun()
+
+        if name in opened:
+            text, truncated = read_preview(full)
+            st.text_area("Preview", text, height=200, key=f"{key}_text_{name}")
+            if truncated:
+                st.caption(f"Showing the first {PREVIEW_CHARS:,} characters of {format_size(size)}.")
+                with open(full, "rb") as f:
+                    st.download_button("Download full file", f, file_name=name, key=f"{key}_dl_{name}")
@@ -0,0 +1,71 @@
+import re
+import numpy as np
+
+FULL_CREDIT = 0.7      # similarity above this earns full marks
+PARTIAL_CREDIT = 0.4   # ... and above this, half marks
+NGRAM = 3
+
+# ---------------- Helpers ----------------
+def _normalize(text):
+    return " " + re.sub(r"\s+", " ", (text or "").lower()).strip() + " "
+
+def _ngram_rows(texts, n):
+    """Sparse char n-gram counts of texts as (row, col, count) arrays."""
+    if n * 21 > 64:
+        raise ValueError("char n-grams longer than 3 do not fit a 64-bit code")
+    texts = [_normalize(t) for t in texts]
+    codes, rows = [], []
+    for i, t in enumerate(texts):
+        if len(t) < n:
+            continue
+        cp = np.frombuffer(t.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        code = np.zeros(len(cp) - n + 1, dtype=np.uint64)
+        for j in range(n):
+            code = (code << np.uint64(21)) | cp[j:len(cp) - n + 1 + j]
+        codes.append(code)
+        rows.append(np.full(len(code), i, dtype=np.int64))
+    if not codes:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32), 0
+    cols, inv = np.unique(np.concatenate(codes), return_inverse=True)
+    vocab = len(cols)
+    keys, counts = np.unique(np.concatenate(rows) * vocab + inv.ravel(), return_counts=True)
+    return keys // vocab, keys % vocab, counts.astype(np.float32), vocab
+
+def similarity_batch(answers, references, n=NGRAM):
+    """Cosine similarity of each answer to its reference, using char n-gram counts.
+
+    All pairs are vectorized together: the texts become one sparse
+    (row, col, weight) matrix and every pair's dot product is
+    accumulated with one `bincount`. Weights are per-text (sublinear
+    TF, no batch-wide IDF), so a pair scores the same however many
+    other answers are graded with it.
+    """
+    m = len(answers)
+    if m != len(references):
+        raise ValueError("answers and references must have the same length")
+    if m == 0:
+        return np.empty(0, dtype=np.float32)
+    rows, cols, tf, vocab = _ngram_rows(list(answers) + list(references), n)
+    if vocab == 0:
+        return np.zeros(m, dtype=np.float32)
+
+    w = 1.0 + np.log(tf)
+    norms = np.sqrt(np.bincount(rows, weights=w * w, minlength=2 * m))
+
+    # rows < m are answers, rows >= m their references; align them by pair index
+    is_ans = rows < m
+    pair = np.where(is_ans, rows, rows - m)
+    key = pair * vocab + cols
+    _, ia, ib = np.intersect1d(key[is_ans], key[~is_ans], assume_unique=True, return_indices=True)
+    dots = np.bincount(pair[is_ans][ia], weights=w[is_ans][ia] * w[~is_ans][ib], minlength=m)
+
+    denom = norms[:m] * norms[m:]
+    sims = np.divide(dots, denom, out=np.zeros(m), where=denom > 0)
+    return sims.astype(np.float32)
+
+def grade_batch(answers, references, full=FULL_CREDIT, partial=PARTIAL_CREDIT):
+    """Score every answer at once; returns (similarities, levels) with 2=full, 1=partial, 0=poor."""
+    sims = similarity_batch(answers, references)
+    levels = np.where(sims > full, 2, np.where(sims > partial, 1, 0))
+    return sims, levels
@@ -0,0 +1,167 @@
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from embedding_cache import EmbeddingCache
+
+IMAGE_SIZE = 224
+FEATURE_DIM = 1280       # MobileNetV2 pooled output
+BATCH_SIZE = 32
+DECODE_WORKERS = min(8, os.cpu_count() or 2)
+STREAM_CHUNK = 256       # images held in memory at once when classifying a batch
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATURE_CACHE_DIR = os.path.join(BASE_DIR, "cache", "image_features")
+# Part of every cache key: change it if the extractor or preprocessing changes
+FEATURE_MODEL = "mobilenet_v2-imagenet-224-avg-unit"
+
+_cache = None
+_cache_lock = threading.Lock()
+_extractor = None
+_extractor_lock = threading.Lock()
+
+# ---------------- Feature Extractor ----------------
+def get_extractor():
+    """Process-wide MobileNetV2 (ImageNet weights, avg pooling), built and run once on first use.
+
+    TensorFlow is imported here rather than at module level, so tools
+    that only need decoding or the caches do not pay for it.
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            import tensorflow as tf
+            model = tf.keras.applications.MobileNetV2(
+                input_shape=(IMAGE_SIZE, IMAGE_SIZE, 3),
+                include_top=False,
+                weights="imagenet",
+                pooling="avg"
+            )
+            # One dummy batch so the first real call does not pay for graph setup
+            model(np.zeros((1, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32), training=False)
+            _extractor = model
+        return _extractor
+
+
+# ---------------- Decoding ----------------
+def load_image(raw, size=IMAGE_SIZE):
+    """Decode image bytes into a (size, size, 3) float32 array scaled to [0, 1]."""
+    img = Image.open(io.BytesIO(raw))
+    # Let the JPEG decoder downscale while decoding instead of after
+    img.draft("RGB", (size, size))
+    img = img.convert("RGB").resize((size, size))
+    return np.asarray(img, dtype=np.float32) / 255.0
+
+def iter_batches(images, batch_size=BATCH_SIZE, workers=DECODE_WORKERS):
+    """Yield (N, 224, 224, 3) batches of decoded images, in order.
+
+    Images are decoded and resized on a thread pool (PIL releases the
+    GIL), and the next batch is already being decoded while the caller
+    works on the current one.
+    """
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = None
+        for start in range(0, len(images), batch_size):
+            futures = [pool.submit(load_image, raw) for raw in images[start:start + batch_size]]
+            if pending is not None:
+                yield np.stack([f.result() for f in pending])
+            pending = futures
+        if pending:
+            yield np.stack([f.result() for f in pending])
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------- Feature Extraction ----------------
+def extract_features(extractor, images, batch_size=BATCH_SIZE, on_batch=None):
+    """MobileNetV2 features for a list of image bytes as an (N, 1280) float32 array.
+
+    One extractor call per batch instead of per image. `on_batch(done,
+    total)` is called after each batch and may raise to stop early.
+    """
+    out = np.empty((len(images), FEATURE_DIM), dtype=np.float32)
+    done = 0
+    for batch in iter_batches(images, batch_size):
+        # np.asarray accepts both Keras tensors and the TFLite extractor's arrays
+        out[done:done + len(batch)] = np.asarray(extractor(batch, training=False))
+        done += len(batch)
+        if on_batch:
+            on_batch(done, len(images))
+    return out
+
+
+# ---------------- Streaming ----------------
+def _is_image(name):
+    base = os.path.basename(name)
+    return base.lower().endswith(IMAGE_EXTS) and not base.startswith("._")
+
+def count_images(sources):
+    """Number of images `iter_images` will yield, without reading any of them."""
+    total = 0
+    for name, raw in sources:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+                total += sum(1 for info in zf.infolist() if not info.is_dir() and _is_image(info.filename))
+        elif _is_image(name):
+            total += 1
+    return total
+
+def iter_images(sources):
+    """(name, bytes) for uploaded (name, bytes) images and the images inside uploaded ZIPs.
+
+    ZIP members are read one at a time, so a large archive is never
+    unpacked in memory all at once.
+    """
+    for name, raw in sources:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir() and _is_image(info.filename):
+                        yield info.filename, zf.read(info)
+        elif _is_image(name):
+            yield name, raw
+
+def iter_feature_chunks(extractor, images, chunk=STREAM_CHUNK):
+    """Yield (names, features) for an iterable of (name, bytes), at most `chunk` images at a time."""
+    names, raws = [], []
+    for name, raw in images:
+        names.append(name)
+        raws.append(raw)
+        if len(raws) == chunk:
+            yield names, extract_features(extractor, raws)
+            names, raws = [], []
+    if raws:
+        yield names, extract_features(extractor, raws)
+
+
+# ---------------- Feature Cache ----------------
+def image_key(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+def get_feature_cache():
+    """Process-wide store of pooled features keyed by image content hash."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(root=FEATURE_CACHE_DIR)
+        return _cache
+
+def cached_features(extractor, images, on_batch=None):
+    """Like extract_features, but only images not seen before go through the extractor.
+
+    Features live in memory-mapped shards under cache/image_features, so
+    they survive reruns, sessions and restarts; retraining after changing
+    the epochs or adding a few images only extracts the new ones.
+    """
+    keys = [image_key(raw) for raw in images]
+    by_key = dict(zip(keys, images))
+    return get_feature_cache().get_or_compute(
+        keys, FEATURE_MODEL,
+        lambda todo: extract_features(extractor, [by_key[k] for k in todo], on_batch=on_batch),
+    )
@@ -0,0 +1,194 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DB = os.path.join(BASE_DIR, "cache", "jobs.db")
+MAX_HEAVY_JOBS = 2          # heavy jobs running at once across all sessions
+PROGRESS_INTERVAL = 0.5     # seconds between progress writes
+ACTIVE = ("queued", "running")
+HEARTBEAT_SECONDS = 30      # live queues refresh their row in `owners` this often
+STALE_AFTER = 3 * HEARTBEAT_SECONDS
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ---------------- Job Context ----------------
+class JobContext:
+    """Handed to a job function: report progress and check for cancellation."""
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.job_id = job_id
+        self._last = 0.0
+
+    @property
+    def cancelled(self):
+        return self.job_id in self.queue._cancel
+
+    def check(self):
+        """Raise JobCancelled if the user cancelled this job."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        now = time.time()
+        if now - self._last >= PROGRESS_INTERVAL or fraction >= 1.0:
+            self._last = now
+            self.queue._update(self.job_id, progress=min(1.0, fraction), message=message)
+
+
+# ---------------- Job Queue ----------------
+class JobQueue:
+    """Local job queue: a bounded worker pool with job state in SQLite.
+
+    Tools `submit` a function and poll `get` for status and progress.
+    At most `workers` jobs run at once; the rest wait as 'queued'.
+    Results stay in memory in this process (they may be models or other
+    objects that do not serialize); status, progress and errors persist.
+    Several server processes can share the database: every job is tagged
+    with its queue's owner id, each queue heartbeats in `owners`, and only
+    active jobs whose owner stopped heartbeating are marked failed.
+    """
+
+    def __init__(self, path=JOBS_DB, workers=MAX_HEAVY_JOBS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._results = {}
+        self._cancel = set()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT,
+                label TEXT,
+                status TEXT,
+                progress REAL DEFAULT 0,
+                message TEXT,
+                error TEXT,
+                created REAL,
+                updated REAL
+            )""")
+        have = {r["name"] for r in self._db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in have:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status)")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS owners (
+                owner TEXT PRIMARY KEY,
+                heartbeat REAL
+            )""")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._beat()
+        self._fail_stale()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def _beat(self):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO owners (owner, heartbeat) VALUES (?, ?)", (self.owner, time.time()))
+            self._db.commit()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            self._beat()
+
+    def _fail_stale(self):
+        """Mark failed the active jobs of queues that stopped heartbeating (e.g. a restarted server)."""
+        cutoff = time.time() - STALE_AFTER
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status='failed', error='Interrupted by a server restart' "
+                "WHERE status IN (?, ?) AND (owner IS NULL OR owner NOT IN "
+                "(SELECT owner FROM owners WHERE heartbeat >= ?))",
+                (*ACTIVE, cutoff),
+            )
+            self._db.execute("DELETE FROM owners WHERE heartbeat < ?", (cutoff,))
+            self._db.commit()
+
+    def _update(self, job_id, **fields):
+        fields["updated"] = time.time()
+        cols = ", ".join(f"{k}=?" for k in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {cols} WHERE id=?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def submit(self, kind, label, fn, *args, **kwargs):
+        """Queue `fn(ctx, *args, **kwargs)`; returns the job id."""
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO jobs (kind, label, status, created, updated, owner) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (kind, label, now, now, self.owner),
+            )
+            self._db.commit()
+            job_id = cur.lastrowid
+        self._pool.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        if job_id in self._cancel:
+            self._cancel.discard(job_id)
+            self._update(job_id, status="cancelled")
+            return
+        self._update(job_id, status="running")
+        try:
+            result = fn(JobContext(self, job_id), *args, **kwargs)
+            if result is not None:
+                # Kept until the submitting tool collects it with pop_result
+                self._results[job_id] = result
+            self._update(job_id, status="done", progress=1.0)
+        except JobCancelled:
+            self._update(job_id, status="cancelled")
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+        finally:
+            self._cancel.discard(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job and job["status"] in ACTIVE:
+            self._cancel.add(job_id)
+            if job["status"] == "queued":
+                self._update(job_id, status="cancelled")
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def result(self, job_id):
+        return self._results.get(job_id)
+
+    def pop_result(self, job_id):
+        return self._results.pop(job_id, None)
+
+    def recent(self, kind=None, limit=20):
+        with self._lock:
+            if kind:
+                rows = self._db.execute(
+                    "SELECT * FROM jobs WHERE kind=? ORDER BY id DESC LIMIT ?", (kind, limit)
+                ).fetchall()
+            else:
+                rows = self._db.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+
+def get_queue():
+    """Process-wide job queue shared by all tools and sessions."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
@@ -0,0 +1,27 @@
+import streamlit as st
+from job_queue import ACTIVE, get_queue
+
+# ---------------- Job Status UI ----------------
+def render_job(job_id, key):
+    """Status, progress and cancel/refresh buttons for a job; returns its row."""
+    queue = get_queue()
+    job = queue.get(job_id)
+    if job is None:
+        return None
+    status = job["status"]
+    if status in ACTIVE:
+        label = job["label"] + (" — waiting for a free worker" if status == "queued" else "")
+        st.progress(job["progress"] or 0.0, text=label)
+        if job["message"]:
+            st.caption(job["message"])
+        c1, c2 = st.columns(2)
+        if c1.button("🔄 Refresh", key=f"{key}_refresh"):
+            st.rerun()
+        if c2.button("✖ Cancel", key=f"{key}_cancel"):
+            queue.cancel(job_id)
+            st.rerun()
+    elif status == "failed":
+        st.error(f"{job['label']} failed: {job['error']}")
+    elif status == "cancelled":
+        st.warning(f"{job['label']} was cancelled.")
+    return job
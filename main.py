@@ -1,6 +1,6 @@
 import streamlit as st
-import importlib
 from login import login_page
+from startup import errors, import_times, is_warm, start_prewarm, timed_import
 
 st.set_page_config(page_title="AI Study Buddy", layout="wide")
 
@@ -117,6 +117,8 @@ def home_page():
 
 # ---------- Dashboard ----------
 def dashboard():
+    # Import TensorFlow, pydub, pypdf and build MobileNetV2 while the user picks a tool
+    start_prewarm()
     st.sidebar.title("📚 Available Tools")
 
     option = st.sidebar.radio(
@@ -222,35 +224,43 @@ def dashboard():
     # ---------- Other Tools ----------
     elif option == "🎙 Speech to Text":
         st.title("🎙 Speech to Text")
-        importlib.import_module("Nene").run()
+        timed_import("Nene").run()
 
     elif option == "📘 Smart Notes":
         st.title("📘 Smart Notes Generator")
-        importlib.import_module("notes_generator").run()
+        timed_import("notes_generator").run()
 
     elif option == "📝 Mock Test":
         st.title("📝 Mock Test Practice")
-        importlib.import_module("exam_practice").run()
+        timed_import("exam_practice").run()
 
     elif option == "📅 Study Planner":
         st.title("📅 Study Planner")
-        importlib.import_module("study").run()
+        timed_import("study").run()
 
     elif option == "👨‍🏫 Teachable Machine":
         st.title("👨‍🏫 Teachable Machine")
-        importlib.import_module("Mee").run()
+        timed_import("Mee").run()
 
     elif option == "⏱️ Time Table Generator":
         st.title("⏱️ Time Table Generator")
-        importlib.import_module("timetable_ai").run()
+        timed_import("timetable_ai").run()
 
     elif option == "❓ Doubt Solver":
         st.title("❓ Doubt Solver")
-        importlib.import_module("1_rag_solver").run()
+        timed_import("1_rag_solver").run()
 
     elif option == "🤖 Digital Mentor":
         st.title("🤖 Digital Mentor")
-        importlib.import_module("2_digital_mentor").run()
+        timed_import("2_digital_mentor").run()
+
+    # Startup timings
+    with st.sidebar.expander("⏱️ Startup"):
+        st.caption("Heavy libraries ready ✅" if is_warm() else "Warming up heavy libraries in the background...")
+        for name, secs in import_times():
+            st.text(f"{name}: {secs:.2f}s")
+        for name, err in errors().items():
+            st.text(f"{name}: failed ({err})")
 
     # Logout Button
     if st.sidebar.button("Logout"):
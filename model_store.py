@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from feature_classifier import DenseHead, PrototypeClassifier
+from image_features import FEATURE_MODEL, load_image
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    Interpreter = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+CALIBRATION_IMAGES = 100    # representative images for int8 quantization
+TFLITE_THREADS = os.cpu_count() or 2
+
+os.makedirs(MODELS_DIR, exist_ok=True)
+
+# ---------------- Helpers ----------------
+def safe_name(name):
+    return "".join(c for c in name if c.isalnum() or c in ("_", "-")) or "model"
+
+def model_dir(name):
+    return os.path.join(MODELS_DIR, safe_name(name))
+
+def list_models():
+    """Saved model names, newest first."""
+    names = [e for e in os.listdir(MODELS_DIR) if os.path.exists(os.path.join(MODELS_DIR, e, "meta.json"))]
+    return sorted(names, key=lambda n: -os.path.getmtime(os.path.join(MODELS_DIR, n, "meta.json")))
+
+
+# ---------------- Save / Load ----------------
+def save_model(name, model):
+    """Save a DenseHead or PrototypeClassifier under models/<name>/ and return the folder.
+
+    The feature extractor is the stock ImageNet MobileNetV2 named by
+    FEATURE_MODEL in meta.json; `export_tflite` can add an int8 copy of it.
+    """
+    path = model_dir(name)
+    os.makedirs(path, exist_ok=True)
+    if isinstance(model, PrototypeClassifier):
+        meta = {"kind": "prototypes", "mode": model.mode, "k": model.k}
+    else:
+        meta = {"kind": "dense"}
+    meta.update(num_classes=model.num_classes, feature_model=FEATURE_MODEL, saved=time.time())
+    np.savez(os.path.join(path, "head.npz"), **model.state())
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return path
+
+def load_meta(name):
+    with open(os.path.join(model_dir(name), "meta.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_model(name):
+    """(classifier, meta) for a saved model; needs NumPy only.
+
+    Raises ValueError if the model was trained on features from another
+    extractor than the current FEATURE_MODEL: its predictions would be noise.
+    """
+    meta = load_meta(name)
+    if meta.get("feature_model") != FEATURE_MODEL:
+        raise ValueError(
+            f"Model '{name}' was trained on {meta.get('feature_model') or 'unknown'} features, "
+            f"not {FEATURE_MODEL}; retrain it."
+        )
+    with np.load(os.path.join(model_dir(name), "head.npz")) as state:
+        if meta["kind"] == "prototypes":
+            model = PrototypeClassifier.from_state(state, meta["mode"], meta["k"])
+        else:
+            model = DenseHead.from_state(state)
+    return model, meta
+
+
+# ---------------- TFLite Extractor ----------------
+def export_tflite(name, extractor, images, on_step=None, check=None):
+    """Write an int8-quantized TFLite copy of the feature extractor next to a saved model.
+
+    `images` (raw bytes) are the representative data for calibrating the
+    quantization ranges; `on_step(done, total)` is called per image and
+    should only report progress, since the converter turns anything raised
+    from the representative dataset into a conversion error. `check()` is
+    called before and after the conversion and may raise to abandon it.
+    """
+    import tensorflow as tf
+
+    sample = images[:CALIBRATION_IMAGES]
+
+    def representative():
+        for n, raw in enumerate(sample, start=1):
+            if on_step:
+                on_step(n, len(sample))
+            yield [load_image(raw)[None]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(extractor)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    if check:
+        check()
+    data = converter.convert()
+    if check:
+        check()
+    path = os.path.join(model_dir(name), "extractor.tflite")
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    return path
+
+def has_tflite(name):
+    return os.path.exists(os.path.join(model_dir(name), "extractor.tflite"))
+
+
+class TFLiteExtractor:
+    """Int8 TFLite feature extractor, called like the Keras model on a float batch."""
+
+    def __init__(self, path, threads=TFLITE_THREADS):
+        self._lock = threading.Lock()   # one interpreter, shared by all sessions
+        interpreter_cls = Interpreter
+        if interpreter_cls is None:
+            import tensorflow as tf
+            interpreter_cls = tf.lite.Interpreter
+        self.interpreter = interpreter_cls(model_path=path, num_threads=threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch = self._input["shape"][0]
+
+    def __call__(self, batch, training=False):
+        with self._lock:
+            return self._invoke(batch)
+
+    def _invoke(self, batch):
+        if len(batch) != self._batch:
+            self.interpreter.resize_tensor_input(self._input["index"], [len(batch), *batch.shape[1:]])
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch = len(batch)
+        scale, zero = self._input["quantization"]
+        q = np.clip(np.round(batch / scale + zero), -128, 127).astype(np.int8)
+        self.interpreter.set_tensor(self._input["index"], q)
+        self.interpreter.invoke()
+        out = self.interpreter.get_tensor(self._output["index"]).astype(np.float32)
+        scale, zero = self._output["quantization"]
+        return (out - zero) * scale
+
+def load_extractor(name):
+    """The saved model's TFLite extractor, or None if it was not exported."""
+    return TFLiteExtractor(os.path.join(model_dir(name), "extractor.tflite")) if has_tflite(name) else None
@@ -0,0 +1,164 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pypdf import PdfReader
+from extract_cache import get_pages, put_pages
+from job_queue import get_queue
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+PAGES_PER_TASK = 8       # pages parsed per worker task
+ADD_BATCH_CHUNKS = 256   # chunks embedded (and cached as one shard) per add_chunks call
+MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# ---------------- Helpers ----------------
+def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Split text into chunk_size windows, consecutive windows sharing `overlap` chars."""
+    text = " ".join(text.split())
+    if not text:
+        return []
+    step = max(1, chunk_size - overlap)
+    return [text[i:i + chunk_size] for i in range(0, max(1, len(text) - overlap), step)]
+
+def count_pages(data):
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+_reader = None   # worker processes: the PDF being extracted, parsed once per worker
+
+def _init_worker(data):
+    """Pool initializer: each worker receives the PDF bytes once and keeps a reader over them."""
+    global _reader
+    _reader = PdfReader(io.BytesIO(data))
+
+def _extract_range(start, end, reader=None):
+    """Worker task: (page_number, text) for pages start..end-1 (1-based numbers)."""
+    reader = reader or _reader
+    out = []
+    for i in range(start, end):
+        try:
+            txt = reader.pages[i].extract_text() or ""
+        except Exception:
+            txt = ""
+        out.append((i + 1, txt))
+    return out
+
+def iter_pdf_pages(data, workers=MAX_WORKERS, pages_per_task=PAGES_PER_TASK):
+    """Yield (page_number, text) as pages are extracted, spreading the PDF over a process pool.
+
+    Ranges are submitted front to back so early pages tend to finish
+    first, but pages are yielded in completion order. Small PDFs are
+    parsed inline to skip the pool start-up cost. The PDF is sent to each
+    worker once, at start-up; tasks only carry their page range.
+    """
+    total = count_pages(data)
+    if workers <= 1 or total <= 2 * pages_per_task:
+        yield from _extract_range(0, total, PdfReader(io.BytesIO(data)))
+        return
+    ctx = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(data,))
+    try:
+        futures = [
+            pool.submit(_extract_range, start, min(start + pages_per_task, total))
+            for start in range(0, total, pages_per_task)
+        ]
+        for fut in as_completed(futures):
+            yield from fut.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------- Ingest Job ----------------
+class IngestJob:
+    """Background ingestion of one PDF into a RagStore, page by page.
+
+    Chunks are added to the store in batches of ADD_BATCH_CHUNKS as pages
+    are extracted, so the document is searchable while the rest of it is
+    still indexing.
+    `key` is the file's content hash: pages already in the shared
+    extraction cache are not parsed again, and a completed extraction is
+    stored there for the next upload (or the Mock Test tool). The work
+    runs on the shared job queue, so it counts against the server's cap
+    on concurrent heavy jobs.
+    """
+
+    def __init__(self, key, name, data, store, workers=MAX_WORKERS):
+        self.key = key
+        self.name = name
+        self.data = data
+        self.store = store
+        self.workers = workers
+        self.total_pages = 0
+        self.done_pages = 0
+        self.num_chunks = 0
+        self.error = None
+        self.cancelled = False
+        self.started = False
+        self.finished = False
+        self.job_id = None
+        self._done = threading.Event()
+
+    def start(self):
+        self.job_id = get_queue().submit("pdf_ingest", f"Indexing {self.name}", self._run)
+        return self
+
+    def cancel(self):
+        """Stop after the current page; chunks already added stay in the store."""
+        self.cancelled = True
+        if self.job_id is not None:
+            queue = get_queue()
+            queue.cancel(self.job_id)
+            if not self.started and queue.get(self.job_id)["status"] == "cancelled":
+                self.finished = True
+                self._done.set()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+
+    @property
+    def progress(self):
+        if self.finished or not self.total_pages:
+            return 1.0 if self.finished else 0.0
+        return self.done_pages / self.total_pages
+
+    def _add(self, texts, pages):
+        self.store.add_chunks(self.key, texts, pages)
+        self.num_chunks += len(texts)
+
+    def _run(self, ctx):
+        self.started = True
+        try:
+            cached = get_pages(self.key)
+            if cached is not None:
+                self.total_pages = len(cached)
+                pages = (page for page in enumerate(cached, start=1))
+            else:
+                self.total_pages = count_pages(self.data)
+                pages = iter_pdf_pages(self.data, self.workers)
+            extracted = {}
+            texts, page_nos = [], []
+            for page_no, text in pages:
+                if self.cancelled:
+                    pages.close()
+                    break
+                extracted[page_no] = text
+                chunks = chunk_text(text)
+                texts.extend(chunks)
+                page_nos.extend([page_no] * len(chunks))
+                # Embed in larger batches: one call per page would write one tiny cache shard per page
+                if len(texts) >= ADD_BATCH_CHUNKS:
+                    self._add(texts, page_nos)
+                    texts, page_nos = [], []
+                self.done_pages += 1
+                ctx.progress(self.progress, f"page {self.done_pages}/{self.total_pages}")
+            self._add(texts, page_nos)
+            if cached is None and not self.cancelled:
+                put_pages(self.key, [extracted[i] for i in range(1, self.total_pages + 1)])
+        except Exception as e:
+            self.error = str(e)
+            raise   # so the job queue records the ingest as failed
+        finally:
+            self.data = None
+            self.finished = True
+            self._done.set()
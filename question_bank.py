@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BANK_DB = os.path.join(BASE_DIR, "cache", "question_bank.db")
+BUILD_WORKERS = 2
+MAX_DOCUMENTS = 200             # pools kept, least recently used dropped first
+MAX_AGE = 30 * 24 * 3600        # pools unused for this long are dropped
+
+_pool = ThreadPoolExecutor(max_workers=BUILD_WORKERS, thread_name_prefix="qbank")
+
+# ---------------- Question Bank ----------------
+class QuestionBank:
+    """Per-document pools of generated questions, stored in SQLite.
+
+    `submit` builds a document's pool once in a background worker, keyed
+    by the document's hash. `sample` then only draws from the pool,
+    least-served questions first, so repeat users of a document get
+    fresh questions until the pool is used up. A failed build is retried
+    on the next submit, and pools beyond MAX_DOCUMENTS or unused for
+    MAX_AGE are pruned, least recently used first.
+    """
+
+    def __init__(self, path=BANK_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS documents (
+                doc_hash TEXT PRIMARY KEY,
+                status TEXT,
+                error TEXT,
+                created REAL
+            )""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_hash TEXT,
+                kind TEXT,
+                payload TEXT,
+                served INTEGER DEFAULT 0
+            )""")
+        have = {r[1] for r in self._db.execute("PRAGMA table_info(documents)")}
+        if "used" not in have:
+            self._db.execute("ALTER TABLE documents ADD COLUMN used REAL")
+            self._db.execute("UPDATE documents SET used=created")
+        self._db.execute("CREATE INDEX IF NOT EXISTS questions_doc ON questions(doc_hash, kind, served)")
+        # Builds interrupted by a restart are retried
+        self._db.execute("DELETE FROM documents WHERE status='building'")
+        self._db.commit()
+
+    def status(self, doc_hash):
+        """'building', 'ready', 'failed' or None if the document was never submitted."""
+        with self._lock:
+            row = self._db.execute("SELECT status FROM documents WHERE doc_hash=?", (doc_hash,)).fetchone()
+        return row[0] if row else None
+
+    def submit(self, doc_hash, text, builder):
+        """Start building the pool for a document unless it exists; `builder(text)` returns (mcqs, shorts).
+
+        A document whose last build failed is built again.
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO documents (doc_hash, status, created, used) VALUES (?, 'building', ?, ?) "
+                "ON CONFLICT(doc_hash) DO UPDATE SET status='building', error=NULL, used=excluded.used "
+                "WHERE status='failed'",
+                (doc_hash, now, now),
+            )
+            self._db.commit()
+            if cur.rowcount == 0:
+                return
+        self.prune()
+        _pool.submit(self._build, doc_hash, text, builder)
+
+    def prune(self, max_documents=MAX_DOCUMENTS, max_age=MAX_AGE):
+        """Drop pools unused for max_age seconds and all but the max_documents most recently used."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM documents WHERE status != 'building' AND (used < ? OR doc_hash NOT IN "
+                "(SELECT doc_hash FROM documents ORDER BY used DESC LIMIT ?))",
+                (time.time() - max_age, max_documents),
+            )
+            self._db.execute("DELETE FROM questions WHERE doc_hash NOT IN (SELECT doc_hash FROM documents)")
+            self._db.commit()
+
+    def _build(self, doc_hash, text, builder):
+        try:
+            mcqs, shorts = builder(text)
+            rows = [(doc_hash, "mcq", json.dumps(q)) for q in mcqs]
+            rows += [(doc_hash, "short", json.dumps(q)) for q in shorts]
+            with self._lock:
+                self._db.execute("DELETE FROM questions WHERE doc_hash=?", (doc_hash,))
+                self._db.executemany("INSERT INTO questions (doc_hash, kind, payload) VALUES (?, ?, ?)", rows)
+                self._db.execute("UPDATE documents SET status='ready' WHERE doc_hash=?", (doc_hash,))
+                self._db.commit()
+        except Exception as e:
+            with self._lock:
+                self._db.execute("UPDATE documents SET status='failed', error=? WHERE doc_hash=?", (str(e), doc_hash))
+                self._db.commit()
+
+    def sample(self, doc_hash, kind, n):
+        """Draw n questions of `kind` ('mcq' or 'short'), least served first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload FROM questions WHERE doc_hash=? AND kind=? ORDER BY served, RANDOM() LIMIT ?",
+                (doc_hash, kind, n),
+            ).fetchall()
+            self._db.executemany("UPDATE questions SET served=served+1 WHERE id=?", [(r[0],) for r in rows])
+            self._db.execute("UPDATE documents SET used=? WHERE doc_hash=?", (time.time(), doc_hash))
+            self._db.commit()
+        return [json.loads(r[1]) for r in rows]
@@ -0,0 +1,106 @@
+import threading
+import numpy as np
+from bm25_index import BM25Index, rrf_fuse
+from vector_index import VectorIndex
+
+CANDIDATES = 4   # each retriever contributes k * CANDIDATES ids to the fusion
+
+# ---------------- RAG Store ----------------
+class RagStore:
+    """Chunks, page map and search indexes of the Doubt Solver's documents.
+
+    Every chunk goes into a BM25 inverted index; when `embed_fn` is given
+    it is also embedded into the vector index and queries are answered by
+    fusing both rankings. Without `embed_fn` the store is keyword-only and
+    never embeds anything.
+
+    Documents are registered by content hash with `add_doc`. `remove_doc`
+    only tombstones a document's chunks in both indexes; they are
+    compacted lazily, and the other documents are never re-indexed.
+
+    Ingestion threads call `add_chunks` while the page searches, so every
+    read and write of the shared lists goes through one lock. Embedding
+    happens outside the lock.
+    """
+
+    def __init__(self, embed_fn=None):
+        self.embed_fn = embed_fn   # list of texts -> (n, dim) float32 array
+        self.index = VectorIndex()
+        self.lexical = BM25Index()
+        self.chunks = []
+        self.page_map = []
+        self.sources = []
+        self.doc_names = {}    # doc key -> file name
+        self.doc_chunks = {}   # doc key -> chunk ids
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.lexical)
+
+    def add_doc(self, key, name):
+        with self._lock:
+            self.doc_names[key] = name
+            self.doc_chunks.setdefault(key, [])
+
+    def remove_doc(self, key):
+        """Tombstone every chunk of document `key`."""
+        with self._lock:
+            ids = self.doc_chunks.pop(key, [])
+            self.doc_names.pop(key, None)
+            if not ids:
+                return
+            if self.dense:
+                self.index.remove(ids)
+            self.lexical.remove(ids)
+            for i in ids:
+                self.chunks[i] = None
+
+    def add_chunks(self, doc, texts, pages):
+        """Embed `texts` (from document key `doc`, on `pages`) and make them searchable."""
+        if not texts:
+            return
+        vecs = self.embed_fn(texts) if self.embed_fn else None
+        with self._lock:
+            if doc not in self.doc_names:
+                return   # removed while its chunks were being embedded
+            start = len(self.chunks)
+            if vecs is not None:
+                self.index.add(vecs, ids=np.arange(start, start + len(texts)))
+            for text in texts:
+                self.lexical.add(text)
+            self.chunks.extend(texts)
+            self.page_map.extend(pages)
+            self.sources.extend([doc] * len(texts))
+            self.doc_chunks[doc].extend(range(start, start + len(texts)))
+
+    @property
+    def dense(self):
+        return self.embed_fn is not None
+
+    def _hits(self, ranked):
+        return [
+            (self.chunks[i], self.page_map[i], self.doc_names[self.sources[i]], float(s))
+            for i, s in ranked
+        ]
+
+    def search(self, qvec, k):
+        """Dense top-k chunks as (text, page, doc, score) tuples."""
+        with self._lock:
+            ids, scores = self.index.search(qvec, k)
+            return self._hits(zip(ids, scores))
+
+    def search_lexical(self, query, k):
+        """BM25 top-k chunks as (text, page, doc, score) tuples."""
+        with self._lock:
+            ids, scores = self.lexical.search(query, k)
+            return self._hits(zip(ids, scores))
+
+    def search_hybrid(self, query, qvec, k):
+        """BM25 and dense rankings fused with reciprocal rank fusion."""
+        if qvec is None or not self.dense:
+            return self.search_lexical(query, k)
+        with self._lock:
+            dense_ids, _ = self.index.search(qvec, k * CANDIDATES)
+            lex_ids, _ = self.lexical.search(query, k * CANDIDATES)
+            fused = rrf_fuse([dense_ids.tolist(), lex_ids.tolist()])[:k]
+            return self._hits(fused)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DB = os.path.join(BASE_DIR, "speech_history.db")
+
+# Columns added to the original history table (name, audio_path, text, timestamp)
+EXTRA_COLUMNS = {
+    "audio_hash": "TEXT",
+    "wav_path": "TEXT",
+    "backend": "TEXT",
+    "size": "INTEGER",
+}
+
+# ---------------- Helpers ----------------
+def audio_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# ---------------- Speech History ----------------
+class SpeechHistory:
+    """Transcript history in speech_history.db, keyed by audio content hash.
+
+    A repeat upload of the same audio (or a rerun of the page) finds its
+    converted WAV and transcript here instead of converting and
+    transcribing again. Listings are served from the indexed table, not
+    from the audio folder.
+    """
+
+    def __init__(self, path=HISTORY_DB):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("""CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                audio_path TEXT,
+                text TEXT,
+                timestamp TEXT
+            )""")
+        have = {r["name"] for r in self._db.execute("PRAGMA table_info(history)")}
+        for col, kind in EXTRA_COLUMNS.items():
+            if col not in have:
+                self._db.execute(f"ALTER TABLE history ADD COLUMN {col} {kind}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_hash ON history(audio_hash, backend)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_time ON history(timestamp)")
+        self._db.commit()
+
+    def lookup(self, digest, backend):
+        """Latest entry for this audio and recognizer whose WAV still exists, or None."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM history WHERE audio_hash=? AND backend=? ORDER BY id DESC",
+                (digest, backend),
+            ).fetchall()
+        for row in rows:
+            if row["wav_path"] and os.path.exists(row["wav_path"]):
+                return dict(row)
+        return None
+
+    def find_wav(self, digest):
+        """A converted WAV already stored for this audio (any recognizer), or None."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT wav_path FROM history WHERE audio_hash=? ORDER BY id DESC", (digest,)
+            ).fetchall()
+        for row in rows:
+            if row["wav_path"] and os.path.exists(row["wav_path"]):
+                return row["wav_path"]
+        return None
+
+    def record(self, name, digest, audio_path, wav_path, text, backend):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO history (name, audio_path, text, timestamp, audio_hash, wav_path, backend, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, audio_path, text, datetime.now().isoformat(timespec="seconds"), digest, wav_path,
+                 backend, os.path.getsize(audio_path) if os.path.exists(audio_path) else None),
+            )
+            self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def recent(self, limit=20, offset=0):
+        """Newest entries first, without the transcript text."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, name, timestamp, backend, size, wav_path FROM history "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def text(self, entry_id):
+        with self._lock:
+            row = self._db.execute("SELECT text FROM history WHERE id=?", (entry_id,)).fetchone()
+        return row["text"] if row else ""
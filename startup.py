@@ -0,0 +1,74 @@
+import importlib
+import sys
+import threading
+import time
+
+# Heavy third-party modules the tools import; warmed in the background after login
+PREWARM_MODULES = ["tensorflow", "pydub", "pypdf", "speech_recognition", "PIL"]
+
+_timings = {}        # name -> seconds for its first import (or warm-up step)
+_errors = {}
+_lock = threading.Lock()
+_thread = None
+_done = threading.Event()
+
+# ---------------- Helpers ----------------
+def timed_import(name):
+    """importlib.import_module that records how long the first import took.
+
+    Always goes through import_module, which waits on the module's import
+    lock: a module another thread is still importing is never returned
+    half-initialized. Only imports that started from scratch are timed.
+    """
+    first = name not in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if first:
+        with _lock:
+            _timings.setdefault(name, time.perf_counter() - start)
+    return module
+
+def _timed(label, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        with _lock:
+            _errors[label] = str(e)
+        return
+    with _lock:
+        _timings.setdefault(label, time.perf_counter() - start)
+
+
+# ---------------- Prewarm ----------------
+def _prewarm():
+    try:
+        for name in PREWARM_MODULES:
+            try:
+                timed_import(name)
+            except Exception as e:
+                with _lock:
+                    _errors[name] = str(e)
+        _timed("MobileNetV2 graph", lambda: timed_import("image_features").get_extractor())
+    finally:
+        _done.set()
+
+def start_prewarm():
+    """Warm heavy imports and the MobileNetV2 graph in a daemon thread, once per process."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_prewarm, name="prewarm", daemon=True)
+            _thread.start()
+
+def is_warm():
+    return _done.is_set()
+
+def import_times():
+    """(name, seconds) of measured imports and warm-up steps, slowest first."""
+    with _lock:
+        return sorted(_timings.items(), key=lambda x: -x[1])
+
+def errors():
+    with _lock:
+        return dict(_errors)
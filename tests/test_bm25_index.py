@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bm25_index import BM25Index
+
+
+def build(texts):
+    index = BM25Index()
+    for text in texts:
+        index.add(text)
+    return index
+
+
+def test_removed_chunks_do_not_count_toward_df():
+    filler = [f"unrelated chunk number {i}" for i in range(20)]
+    removed = build(["enzyme kinetics", "enzyme inhibition", "enzyme structure"] + filler)
+    # Below the compaction threshold, so the postings are only tombstoned
+    removed.remove([1, 2])
+    assert removed.num_compacted < removed.num_dead
+    fresh = build(["enzyme kinetics"] + filler)
+    assert abs(removed.scores("enzyme")[0] - fresh.scores("enzyme")[0]) < 1e-5
+    assert not removed.scores("enzyme")[1:3].any()
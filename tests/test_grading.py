@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grading import similarity_batch
+
+
+def test_pair_score_does_not_depend_on_batch():
+    answer = "Photosynthesis turns light energy into chemical energy in plants"
+    reference = "Plants convert light energy to chemical energy by photosynthesis"
+    alone = similarity_batch([answer], [reference])[0]
+    batch = similarity_batch(
+        [answer, "The mitochondria is the powerhouse of the cell", "Water boils at 100 degrees", ""],
+        [reference, "Mitochondria produce ATP", "Boiling point of water at sea level", "Newton's first law"],
+    )
+    assert abs(batch[0] - alone) < 1e-6
+
+
+def test_identical_answer_gets_full_similarity():
+    assert similarity_batch(["same text"], ["same text"])[0] > 0.999
@@ -0,0 +1,143 @@
+import os
+import re
+import sqlite3
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DB = os.path.join(BASE_DIR, "cache", "text_search.db")
+SEARCH_DIRS = [os.path.join(BASE_DIR, "texts"), os.path.join(BASE_DIR, "notes")]
+
+_index = None
+_index_lock = threading.Lock()
+
+# ---------------- Helpers ----------------
+def fts_query(text):
+    """Turn free text into a safe FTS5 query: quoted terms, a longer last one as a prefix."""
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    if len(terms[-1]) >= 3:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# ---------------- Text Index ----------------
+class TextIndex:
+    """SQLite FTS5 index over the saved transcripts and notes.
+
+    `sync` brings the index up to date with the folders by comparing
+    mtimes and sizes; `index_file` / `remove_file` keep it current when
+    files are saved or deleted through the app, so searches never touch
+    the files themselves.
+    """
+
+    def __init__(self, path=SEARCH_DB, folders=SEARCH_DIRS):
+        self.folders = folders
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+                path UNINDEXED, folder UNINDEXED, name, body, tokenize='porter unicode61'
+            )""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                doc_id INTEGER,
+                mtime REAL,
+                size INTEGER
+            )""")
+        self._db.commit()
+
+    def _remove(self, path):
+        row = self._db.execute("SELECT doc_id FROM files WHERE path=?", (path,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM docs WHERE rowid=?", (row[0],))
+            self._db.execute("DELETE FROM files WHERE path=?", (path,))
+
+    def _index(self, path, stat):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            body = f.read()
+        self._remove(path)
+        cur = self._db.execute(
+            "INSERT INTO docs (path, folder, name, body) VALUES (?, ?, ?, ?)",
+            (path, os.path.basename(os.path.dirname(path)), os.path.splitext(os.path.basename(path))[0], body),
+        )
+        self._db.execute(
+            "INSERT INTO files (path, doc_id, mtime, size) VALUES (?, ?, ?, ?)",
+            (path, cur.lastrowid, stat.st_mtime, stat.st_size),
+        )
+
+    def index_file(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            if os.path.exists(path):
+                self._index(path, os.stat(path))
+            else:
+                self._remove(path)
+            self._db.commit()
+
+    def remove_file(self, path):
+        with self._lock:
+            self._remove(os.path.abspath(path))
+            self._db.commit()
+
+    def sync(self):
+        """Index new or changed .txt files and drop deleted ones; returns files touched."""
+        with self._lock:
+            known = {p: (m, s) for p, m, s in self._db.execute("SELECT path, mtime, size FROM files")}
+            seen, touched = set(), 0
+            for folder in self.folders:
+                if not os.path.isdir(folder):
+                    continue
+                for e in os.scandir(folder):
+                    if not e.name.endswith(".txt"):
+                        continue
+                    path = os.path.abspath(e.path)
+                    st = e.stat()
+                    seen.add(path)
+                    if known.get(path) != (st.st_mtime, st.st_size):
+                        self._index(path, st)
+                        touched += 1
+            for path in known.keys() - seen:
+                self._remove(path)
+                touched += 1
+            self._db.commit()
+        return touched
+
+    def search(self, text, limit=20):
+        """Best matches as dicts with path, folder, name and a highlighted snippet."""
+        query = fts_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, folder, name, snippet(docs, 3, '**', '**', ' … ', 16), bm25(docs, 0, 0, 5.0, 1.0) AS rank "
+                "FROM docs WHERE docs MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [{"path": p, "folder": f, "name": n, "snippet": s, "rank": r} for p, f, n, s, r in rows]
+
+
+def get_index():
+    """Process-wide TextIndex, synced with the folders on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TextIndex()
+            _index.sync()
+        return _index
+
+
+# ---------------- Search UI ----------------
+def render_search(key):
+    """Search box over saved texts and notes, with matching snippets below it."""
+    import streamlit as st
+
+    q = st.text_input("Search saved texts and smart notes", key=f"{key}_query")
+    if q.strip():
+        results = get_index().search(q)
+        if not results:
+            st.info("No matches.")
+        for r in results:
+            st.markdown(f"**{r['name']}** · _{r['folder']}_  \n{r['snippet']}")
@@ -0,0 +1,159 @@
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+import speech_recognition as sr
+
+MAX_SEGMENT_MS = 45_000    # keep each request well under the recognizer's limits
+MIN_SILENCE_MS = 700
+KEEP_SILENCE_MS = 250
+SILENCE_OFFSET_DB = 16     # silence = quieter than (average loudness - offset)
+SEEK_STEP_MS = 10          # silence detection step; pydub's default of 1 ms is ~10x slower
+SCAN_RATE = 16_000         # silence is detected on a mono copy at this rate
+SCAN_BLOCK_MS = 60_000     # audio scanned per step, so the first segments start early
+WORKERS = 4
+# Set to 1 to offer test-only recognizers (e.g. "offline") in the app
+TEST_BACKENDS_ENV = "STUDY_BUDDY_TEST_BACKENDS"
+
+# ---------------- Segmentation ----------------
+def iter_speech(audio, min_silence_ms=MIN_SILENCE_MS, thresh=-60):
+    """Yield (start_ms, end_ms) speech ranges, scanning SCAN_BLOCK_MS of audio at a time.
+
+    Each block is scanned as a mono 16 kHz copy with a SEEK_STEP_MS step,
+    so boundaries are accurate to about 10 ms at a fraction of the cost.
+    A range that may run on into the next block is rescanned from its
+    start together with that block.
+    """
+    pos, total = 0, len(audio)
+    while pos < total:
+        end = min(pos + SCAN_BLOCK_MS, total)
+        block = audio[pos:end].set_channels(1).set_frame_rate(SCAN_RATE)
+        ranges = detect_nonsilent(block, min_silence_len=min_silence_ms, silence_thresh=thresh,
+                                  seek_step=SEEK_STEP_MS)
+        next_pos = end
+        if end < total and ranges and ranges[-1][1] > (end - pos) - min_silence_ms:
+            if ranges[-1][0] > 0:
+                next_pos = pos + ranges.pop()[0]
+            # else: one range fills the whole block; emit it and carry on after it
+        for start, stop in ranges:
+            yield pos + start, pos + stop
+        pos = next_pos
+
+def iter_segments(audio, max_ms=MAX_SEGMENT_MS, min_silence_ms=MIN_SILENCE_MS):
+    """Yield silence-split (start_ms, end_ms) ranges no longer than max_ms as they are found.
+
+    Neighbouring speech ranges are merged while they fit in max_ms; a
+    single range that is longer anyway is cut into max_ms pieces.
+    """
+    thresh = audio.dBFS - SILENCE_OFFSET_DB if audio.dBFS != float("-inf") else -60
+    current = None
+    for start, end in iter_speech(audio, min_silence_ms, thresh):
+        start = max(0, start - KEEP_SILENCE_MS)
+        end = min(len(audio), end + KEEP_SILENCE_MS)
+        if current and end - current[0] <= max_ms:
+            current = (current[0], end)
+            continue
+        if current:
+            yield current
+        pieces = [(s, min(s + max_ms, end)) for s in range(start, end, max_ms)]
+        yield from pieces[:-1]
+        current = pieces[-1]
+    if current:
+        yield current
+
+def split_segments(audio, max_ms=MAX_SEGMENT_MS, min_silence_ms=MIN_SILENCE_MS):
+    """All of `iter_segments` as a list."""
+    return list(iter_segments(audio, max_ms, min_silence_ms))
+
+
+# ---------------- Recognizer Backends ----------------
+class RecognizerBackend:
+    """Turns one short AudioSegment into text. Subclass and register in BACKENDS."""
+
+    name = "base"
+    test_only = False   # stub output is not a real transcript: hidden from users, never stored
+
+    def recognize(self, segment):
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+
+    def recognize(self, segment):
+        buf = io.BytesIO()
+        segment.export(buf, format="wav")
+        buf.seek(0)
+        r = sr.Recognizer()
+        with sr.AudioFile(buf) as src:
+            audio = r.record(src)
+        try:
+            return r.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ""
+
+
+class OfflineStubBackend(RecognizerBackend):
+    """Local stand-in for tests and offline use: reports segment lengths instead of words."""
+
+    name = "offline"
+    test_only = True
+
+    def recognize(self, segment):
+        return f"[{len(segment) / 1000:.1f}s of speech]"
+
+
+BACKENDS = {b.name: b for b in (GoogleBackend, OfflineStubBackend)}
+
+def user_backends():
+    """Recognizer names to offer in the UI; test stubs only when TEST_BACKENDS_ENV is set."""
+    show_tests = os.environ.get(TEST_BACKENDS_ENV) == "1"
+    return [name for name, b in BACKENDS.items() if show_tests or not b.test_only]
+
+def is_test_backend(name):
+    return BACKENDS[name].test_only
+
+
+# ---------------- Transcription ----------------
+def transcribe_file(path, backend="google", workers=WORKERS, on_partial=None):
+    """Transcribe an audio file segment by segment on a worker pool.
+
+    Results are reassembled in order. `on_partial(text, done, total)` is
+    called from the calling thread each time a segment finishes, with
+    the text of the segments finished so far and the number of segments
+    found so far (the scan runs alongside recognition); raising from it
+    stops the transcription.
+    """
+    if isinstance(backend, str):
+        backend = BACKENDS[backend]()
+    audio = AudioSegment.from_file(path)
+    results, futures = [], {}
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def collect(timeout):
+        nonlocal done
+        finished, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for fut in finished:
+            i = futures.pop(fut)
+            try:
+                results[i] = fut.result()
+            except Exception:
+                results[i] = ""
+            done += 1
+            if on_partial:
+                on_partial(" ".join(t for t in results if t), done, len(results))
+
+    try:
+        # Segments go to the pool as soon as the scan finds them
+        for start, end in iter_segments(audio):
+            futures[pool.submit(backend.recognize, audio[start:end])] = len(results)
+            results.append(None)
+            collect(0)
+        while futures:
+            collect(None)
+    finally:
+        # If on_partial raised (e.g. the job was cancelled), drop the segments not yet started
+        pool.shutdown(wait=False, cancel_futures=True)
+    return " ".join(t for t in results if t)
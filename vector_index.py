@@ -0,0 +1,211 @@
+import numpy as np
+
+IVF_THRESHOLD = 100_000   # switch to coarse-quantized search above this many vectors
+KMEANS_ITERS = 10
+KMEANS_SAMPLE = 100_000
+ASSIGN_BLOCK = 65_536
+COMPACT_RATIO = 0.25      # compact once this fraction of rows is tombstoned
+
+# ---------------- Helpers ----------------
+def normalize(mat):
+    """Return `mat` as float32 rows scaled to unit length (zero rows stay zero)."""
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat[None, :]
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+def top_k(scores, k):
+    """Indices of the k largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
+
+def assign_nearest(vecs, centroids):
+    """Nearest centroid (by dot product) for each row, computed in blocks."""
+    out = np.empty(len(vecs), dtype=np.int32)
+    for start in range(0, len(vecs), ASSIGN_BLOCK):
+        block = vecs[start:start + ASSIGN_BLOCK]
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+def spherical_kmeans(vecs, nlist, iters=KMEANS_ITERS, sample=KMEANS_SAMPLE, seed=0):
+    """Train `nlist` unit-length centroids on a random sample of `vecs`."""
+    rng = np.random.default_rng(seed)
+    if len(vecs) > sample:
+        vecs = vecs[np.sort(rng.choice(len(vecs), sample, replace=False))]
+    centroids = vecs[rng.choice(len(vecs), nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = assign_nearest(vecs, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vecs)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+
+# ---------------- Vector Index ----------------
+class VectorIndex:
+    """Cosine top-k search over one contiguous float32 matrix.
+
+    Rows are stored unit-normalized so a query is a single matrix-vector
+    product followed by `argpartition`. Above `ivf_threshold` rows the index
+    switches to an IVF layout: rows are clustered around `nlist` coarse
+    centroids and a query only scans the `nprobe` closest clusters.
+
+    `remove` only tombstones rows; the matrix is compacted lazily once
+    more than `COMPACT_RATIO` of it is dead. Ids stay stable either way.
+    """
+
+    def __init__(self, dim=None, ivf_threshold=IVF_THRESHOLD, nlist=None, nprobe=8):
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._vecs = np.empty((0, dim or 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._dead = 0
+        self._alive = np.empty(0, dtype=bool)
+        self._next_id = 0
+        self._centroids = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._order = None
+        self._offsets = None
+
+    def __len__(self):
+        return self._size - self._dead
+
+    @property
+    def vectors(self):
+        return self._vecs[:self._size]
+
+    @property
+    def ids(self):
+        return self._ids[:self._size]
+
+    @property
+    def is_ivf(self):
+        return self._centroids is not None
+
+    def _reserve(self, extra):
+        need = self._size + extra
+        if need <= len(self._vecs):
+            return
+        cap = max(need, 2 * len(self._vecs), 1024)
+        vecs = np.empty((cap, self.dim), dtype=np.float32)
+        vecs[:self._size] = self._vecs[:self._size]
+        ids = np.empty(cap, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        assign = np.zeros(cap, dtype=np.int32)
+        assign[:self._size] = self._assign[:self._size]
+        alive = np.zeros(cap, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._vecs, self._ids, self._assign, self._alive = vecs, ids, assign, alive
+
+    def add(self, vectors, ids=None):
+        """Append vectors (one per row); returns the ids assigned to them."""
+        vecs = normalize(vectors)
+        if self.dim is None:
+            self.dim = vecs.shape[1]
+            self._vecs = np.empty((0, self.dim), dtype=np.float32)
+        if vecs.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dim {self.dim}, got {vecs.shape[1]}")
+        n = len(vecs)
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != n:
+            raise ValueError("ids and vectors must have the same length")
+
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        self._vecs[start:end] = vecs
+        self._ids[start:end] = ids
+        self._alive[start:end] = True
+        self._size = end
+        if n:
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+        if self.is_ivf:
+            self._assign[start:end] = assign_nearest(vecs, self._centroids)
+            self._order = None
+        elif self.ivf_threshold and len(self) >= self.ivf_threshold:
+            self.build_ivf()
+        return ids
+
+    def remove(self, ids):
+        """Tombstone the rows with the given ids; compacts when enough are dead."""
+        rows = np.flatnonzero(np.isin(self.ids, np.asarray(ids, dtype=np.int64)) & self._alive[:self._size])
+        if len(rows) == 0:
+            return 0
+        self._alive[rows] = False
+        self._dead += len(rows)
+        if self._dead > COMPACT_RATIO * self._size:
+            self.compact()
+        return len(rows)
+
+    def compact(self):
+        """Drop tombstoned rows so the matrix is contiguous again."""
+        if not self._dead:
+            return
+        keep = np.flatnonzero(self._alive[:self._size])
+        self._vecs = np.ascontiguousarray(self._vecs[keep])
+        self._ids = self._ids[keep]
+        self._assign = self._assign[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._size = len(keep)
+        self._dead = 0
+        self._order = None
+
+    # ---------- IVF ----------
+    def build_ivf(self, nlist=None):
+        """Cluster the stored rows and switch to coarse-quantized search."""
+        n = self._size
+        nlist = nlist or self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+        if nlist < 2:
+            return
+        self._centroids = spherical_kmeans(self.vectors, nlist)
+        self._assign[:n] = assign_nearest(self.vectors, self._centroids)
+        self._order = None
+
+    def _lists(self):
+        if self._order is None:
+            assign = self._assign[:self._size]
+            self._order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=len(self._centroids))
+            self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        return self._order, self._offsets
+
+    def _probe_rows(self, q, nprobe):
+        order, offsets = self._lists()
+        cells = top_k(self._centroids @ q, nprobe)
+        return np.concatenate([order[offsets[c]:offsets[c + 1]] for c in cells])
+
+    # ---------- Search ----------
+    def search(self, qvec, k=5, nprobe=None):
+        """Return (ids, scores) of the k rows most cosine-similar to `qvec`."""
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = normalize(qvec)[0]
+        if self.is_ivf:
+            rows = self._probe_rows(q, nprobe or self.nprobe)
+        elif self._dead:
+            rows = np.arange(self._size)
+        else:
+            scores = self.vectors @ q
+            best = top_k(scores, k)
+            return self._ids[best], scores[best]
+        if self._dead:
+            rows = rows[self._alive[rows]]
+        scores = self._vecs[rows] @ q
+        best = top_k(scores, k)
+        return self._ids[rows[best]], scores[best]
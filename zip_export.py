@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_CACHE = os.path.join(BASE_DIR, "cache", "export")
+UTF8_FLAG = 0x0800
+BLOB_GRACE = 60          # seconds a new blob is kept before it must be in the manifest
+
+# ---------------- Helpers ----------------
+def select_files(folder, names=None, start=None, end=None, ext=".txt"):
+    """(name, path, mtime) of files in folder, optionally limited to `names` and a date range."""
+    out = []
+    for e in os.scandir(folder):
+        if not e.name.endswith(ext) or (names and e.name not in names):
+            continue
+        mtime = e.stat().st_mtime
+        day = time.localtime(mtime)[:3]
+        if start and day < start.timetuple()[:3]:
+            continue
+        if end and day > end.timetuple()[:3]:
+            continue
+        out.append((e.name, e.path, mtime))
+    return sorted(out)
+
+def _dos_datetime(mtime):
+    t = time.localtime(mtime)
+    year = max(t.tm_year, 1980)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+# ---------------- Compressed Entry Cache ----------------
+class ExportCache:
+    """Deflated file contents reused across exports.
+
+    `manifest.json` maps each exported path to its (mtime, size) and the
+    SHA-256 of its content; the raw-deflate blob for a content hash is
+    stored once. A file that has not changed since the last export is
+    never read or compressed again. `save` forgets files that no longer
+    exist and deletes the blobs nothing refers to any more.
+    """
+
+    def __init__(self, root=EXPORT_CACHE):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._manifest_path = os.path.join(root, "manifest.json")
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self._dirty = False
+
+    def entry(self, path):
+        """Manifest entry (sha256, crc, size, csize) for path, compressing it only if it changed."""
+        info = os.stat(path)
+        with self._lock:
+            e = self.manifest.get(path)
+            if e and e["mtime"] == info.st_mtime and e["size"] == info.st_size and os.path.exists(self.blob(e["sha256"])):
+                return e
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.blob(digest)
+        if not os.path.exists(blob):
+            comp = zlib.compressobj(6, zlib.DEFLATED, -15)
+            packed = comp.compress(data) + comp.flush()
+            tmp = f"{blob}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(packed)
+            os.replace(tmp, blob)
+        e = {
+            "mtime": info.st_mtime,
+            "size": len(data),
+            "sha256": digest,
+            "crc": zlib.crc32(data),
+            "csize": os.path.getsize(blob),
+        }
+        with self._lock:
+            self.manifest[path] = e
+            self._dirty = True
+        return e
+
+    def blob(self, digest):
+        return os.path.join(self.root, digest + ".deflate")
+
+    def save(self):
+        """Prune entries for deleted files and unreferenced blobs, then write the manifest."""
+        with self._lock:
+            for path in [p for p in self.manifest if not os.path.exists(p)]:
+                del self.manifest[path]
+                self._dirty = True
+            live = {e["sha256"] for e in self.manifest.values()}
+            # Blobs written moments ago may belong to an entry() still in progress
+            cutoff = time.time() - BLOB_GRACE
+            for e in os.scandir(self.root):
+                if e.name.endswith(".deflate") and e.name[:-len(".deflate")] not in live:
+                    try:
+                        if e.stat().st_mtime < cutoff:
+                            os.remove(e.path)
+                    except OSError:
+                        pass
+            if not self._dirty:
+                return
+            tmp = f"{self._manifest_path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp, self._manifest_path)
+            self._dirty = False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExportCache()
+        return _cache
+
+
+# ---------------- ZIP Stream ----------------
+def iter_zip(files, cache=None):
+    """Yield a ZIP archive of (name, path, mtime) files chunk by chunk, without a temp file."""
+    cache = cache or get_cache()
+    central, offset = [], 0
+    for name, path, mtime in files:
+        e = cache.entry(path)
+        fname = name.encode("utf-8")
+        dtime, ddate = _dos_datetime(mtime)
+        header = struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 20, UTF8_FLAG, 8, dtime, ddate,
+            e["crc"], e["csize"], e["size"], len(fname), 0,
+        ) + fname
+        yield header
+        with open(cache.blob(e["sha256"]), "rb") as f:
+            while True:
+                chunk = f.read(1 << 16)
+                if not chunk:
+                    break
+                yield chunk
+        central.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, UTF8_FLAG, 8, dtime, ddate,
+            e["crc"], e["csize"], e["size"], len(fname), 0, 0, 0, 0, 0, offset,
+        ) + fname)
+        offset += len(header) + e["csize"]
+    cd = b"".join(central)
+    yield cd
+    yield struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central), len(cd), offset, 0)
+    cache.save()
+
+def export_zip(folder, names=None, start=None, end=None):
+    """ZIP bytes of the selected files in folder, ready for st.download_button."""
+    return b"".join(iter_zip(select_files(folder, names, start, end)))
+
+
+# ---------------- Export UI ----------------
+def render_export(folder, key, file_name="all_texts.zip"):
+    """File/date pickers and an "Export as ZIP" button for a folder's text files."""
+    import streamlit as st
+    from file_browser import list_files
+
+    with st.expander("Choose files / dates"):
+        picked = st.multiselect("Files (leave empty for all)", [f[0] for f in list_files(folder)], key=f"{key}_pick")
+        dates = st.date_input("Modified between", [], key=f"{key}_dates")
+    if st.button("Export as ZIP", key=f"{key}_zip"):
+        start = dates[0] if len(dates) > 0 else None
+        end = dates[1] if len(dates) > 1 else start
+        # Assembled from cached compressed entries; nothing is written to disk
+        data = export_zip(folder, picked or None, start, end)
+        st.success("✅ ZIP ready")
+        st.download_button("Download ZIP", data, file_name=file_name, mime="application/zip", key=f"{key}_download")